@@ -3,7 +3,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
-from .models import Form1098T, Form1098TDownload
+from .models import Form1098T, Form1098TDownload, Form1098TPublishRun
 
 
 @admin.register(Form1098T)
@@ -24,6 +24,7 @@ class Form1098TAdmin(admin.ModelAdmin):
         'created_at',
         'updated_at',
         'file_size',
+        'fingerprint',
         'download_count_display',
         'last_downloaded_display'
     ]
@@ -42,7 +43,7 @@ class Form1098TAdmin(admin.ModelAdmin):
             )
         }),
         ('File Details', {
-            'fields': ('file_path', 'file_size')
+            'fields': ('file_path', 'file_size', 'fingerprint')
         }),
         ('Publishing', {
             'fields': ('is_published', 'published_at', 'published_by')
@@ -99,4 +100,30 @@ class Form1098TDownloadAdmin(admin.ModelAdmin):
         return False
     
     def has_change_permission(self, request, obj=None):
-        return False
\ No newline at end of file
+        return False
+
+
+@admin.register(Form1098TPublishRun)
+class Form1098TPublishRunAdmin(admin.ModelAdmin):
+    list_display = [
+        'tax_year',
+        'status',
+        'success_count',
+        'unchanged_count',
+        'skipped_count',
+        'error_count',
+        'chunks_completed',
+        'elapsed_seconds',
+        'started_by',
+        'started_at',
+        'finished_at'
+    ]
+    list_filter = ['tax_year', 'status']
+    readonly_fields = [
+        'tax_year', 'status', 'student_ids', 'last_student_id', 'chunks_completed',
+        'success_count', 'unchanged_count', 'skipped_count', 'error_count', 'errors', 'elapsed_seconds',
+        'started_by', 'started_at', 'finished_at', 'updated_at'
+    ]
+    
+    def has_add_permission(self, request):
+        return False
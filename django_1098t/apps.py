@@ -54,7 +54,7 @@ class Django1098TConfig(AppConfig):
     
     def ready(self):
         """Import signals and perform app initialization."""
-        pass
+        from . import signals  # noqa: F401
 
 
 class DevDjango1098TConfig(AppConfig):
@@ -65,5 +65,5 @@ class DevDjango1098TConfig(AppConfig):
     
     def ready(self):
         """Import signals and perform app initialization."""
-        pass
+        from . import signals  # noqa: F401
     
\ No newline at end of file
@@ -53,4 +53,9 @@ def get_template_path(tax_year):
             f"Please add the PDF template to django_1098t/templates_pdf/f1098t/{template_filename}"
         )
     
-    return template_path
\ No newline at end of file
+    return template_path
+
+
+def has_electronic_consent(student):
+    """Whether the student has consented to receiving 1098-T forms electronically."""
+    return bool(student.meta) and bool(student.meta.get('form_1098_consent_granted_on'))
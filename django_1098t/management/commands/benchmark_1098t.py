@@ -0,0 +1,297 @@
+# django_1098t/management/commands/benchmark_1098t.py
+
+import contextlib
+import datetime
+import json
+import resource
+import sys
+import time
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from ...services.backends import MemoryStorage
+from ...services.generator import Form1098TGenerator
+from ...constants import get_template_path
+
+
+class Command(BaseCommand):
+    """
+    python manage.py benchmark_1098t 2025 --forms 500 --students 200 --save-baseline bench.json
+    python manage.py benchmark_1098t 2025 --compare bench.json
+    
+    The publish and report stages work on the students with transactions
+    in the tax year, so run them against a copy of production data.
+    """
+    help = 'Benchmark 1098-T generation, publishing and report exports'
+
+    STAGES = ('generate', 'publish', 'reports')
+
+    def add_arguments(self, parser):
+        parser.add_argument('tax_year', type=int, help='Tax year (e.g., 2025)')
+        parser.add_argument(
+            '--forms',
+            type=int,
+            default=200,
+            help='Synthetic forms to generate for the throughput run (default: 200)'
+        )
+        parser.add_argument(
+            '--students',
+            type=int,
+            help='Publish only the first N students with transactions in the year (default: all)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='PDF generation processes for the publish run (default: FORM_1098T_GENERATION_WORKERS or 1)'
+        )
+        parser.add_argument(
+            '--upload-workers',
+            type=int,
+            help='Upload threads for the publish run (default: FORM_1098T_UPLOAD_WORKERS or 1)'
+        )
+        parser.add_argument(
+            '--stage',
+            action='append',
+            choices=self.STAGES,
+            help='Only run the given stage; may be repeated (default: all)'
+        )
+        parser.add_argument(
+            '--engine',
+            choices=Form1098TGenerator.ENGINES,
+            help='Fill engine to benchmark (default: FORM_1098T_FILL_ENGINE or pypdf)'
+        )
+        parser.add_argument(
+            '--save-baseline',
+            type=str,
+            help='Write the results to this JSON file'
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            help='Compare the results against a JSON baseline'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=10.0,
+            help='Percent slowdown reported as a regression when comparing (default: 10)'
+        )
+
+    def handle(self, *args, **options):
+        tax_year = options['tax_year']
+        stages = options.get('stage') or self.STAGES
+
+        results = {
+            'tax_year': tax_year,
+            'run_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'metrics': {},
+        }
+        metrics = results['metrics']
+
+        if 'generate' in stages:
+            metrics.update(self._benchmark_generation(tax_year, options['forms'], options.get('engine')))
+
+        # Database stages run inside a transaction that is always rolled
+        # back, and every storage write goes to memory
+        if 'publish' in stages or 'reports' in stages:
+            with transaction.atomic():
+                if 'publish' in stages:
+                    metrics.update(self._benchmark_publish(
+                        tax_year, options.get('students'), options.get('workers'), options.get('upload_workers')
+                    ))
+                if 'reports' in stages:
+                    metrics.update(self._benchmark_reports(tax_year))
+                transaction.set_rollback(True)
+
+        metrics['peak_rss_mb'] = self._peak_rss_mb()
+        self._print_results(metrics)
+
+        if options.get('save_baseline'):
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Baseline saved to {options['save_baseline']}")
+
+        if options.get('compare'):
+            self._compare(metrics, options['compare'], options['threshold'])
+
+    def _benchmark_generation(self, tax_year, count, engine):
+        """Forms/sec and per-form latency of generate_filled_form on synthetic records."""
+        generator = Form1098TGenerator(
+            get_template_path(tax_year),
+            filer_info={'name': 'Benchmark University', 'ein': '00-0000000', 'address': '1 Campus Drive'},
+            engine=engine
+        )
+        # First form pays for template parsing; keep it out of the numbers
+        generator.generate_filled_form(*self._synthetic_record(0))
+
+        latencies, total_bytes = [], 0
+        started = time.perf_counter()
+        for index in range(count):
+            form_started = time.perf_counter()
+            pdf_bytes = generator.generate_filled_form(*self._synthetic_record(index))
+            latencies.append(time.perf_counter() - form_started)
+            total_bytes += len(pdf_bytes.getvalue())
+        elapsed = time.perf_counter() - started
+
+        return {
+            'generate.engine': generator.engine,
+            'generate.forms': count,
+            'generate.forms_per_sec': round(count / elapsed, 2) if elapsed else 0.0,
+            **self._latency_metrics('generate', latencies),
+            'generate.mean_bytes': total_bytes // count if count else 0,
+        }
+
+    @staticmethod
+    def _synthetic_record(index):
+        return (
+            {
+                'name': f"Student {index:06d} Benchmark",
+                'tin': f"{900 + index % 100:03d}-{index % 100:02d}-{index % 10000:04d}",
+                'service_provider_account_number': f"BENCH{index:08d}",
+                'address': f"{index + 1} Synthetic Avenue",
+                'address2': 'Syracuse, NY 13210',
+            },
+            {'payments': 1000 + index % 5000 + 0.5, 'scholarships': index % 2500},
+            {'adjustments': 0.0, 'scholarship_adjustments': 0.0, 'insurance_refund': 0.0},
+            {'jan_march': False, 'halftime': bool(index % 2), 'graduate': False, 'corrected': False},
+        )
+
+    def _benchmark_publish(self, tax_year, limit, workers, upload_workers):
+        """
+        Throughput, stage timings and queries of a bulk publish_all_students
+        run over the year's students. Every form is rebuilt (force), as the
+        first publish of a year would.
+        """
+        from ...services.publisher import Form1098TPublisher
+
+        with override_settings(DJANGO_1098T_STORAGE_CLASS=f'{MemoryStorage.__module__}.MemoryStorage'):
+            publisher = Form1098TPublisher(tax_year, None, workers=workers, upload_workers=upload_workers)
+        # Template parsing and filer settings are one-off costs
+        publisher.generator._new_writer()
+
+        student_ids = sorted(set(publisher._transaction_student_ids()) - {None})
+        if limit is not None:
+            student_ids = student_ids[:limit]
+        if not student_ids:
+            raise CommandError(f"No students have transactions in {tax_year}")
+
+        with CaptureQueriesContext(connection) as queries:
+            results = publisher.publish_all_students(student_ids=student_ids, force=True)
+        MemoryStorage.files.clear()
+        MemoryStorage.modified.clear()
+
+        elapsed = results['elapsed_seconds']
+        metrics = {
+            'publish.workers': publisher.workers,
+            'publish.upload_workers': publisher.upload_workers,
+            'publish.students': len(student_ids),
+            'publish.published': results['success_count'],
+            'publish.errors': results['error_count'],
+            'publish.seconds': elapsed,
+            'publish.students_per_sec': round(len(student_ids) / elapsed, 2) if elapsed else 0.0,
+            'publish.queries': len(queries),
+            'publish.queries_per_student': round(len(queries) / len(student_ids), 2),
+        }
+        for stage, timing in results['stages'].items():
+            metrics[f'publish.{stage}.total_seconds'] = timing['total_seconds']
+            metrics[f'publish.{stage}.p95_ms'] = round(timing['p95_seconds'] * 1000, 3)
+        return metrics
+
+    def _benchmark_reports(self, tax_year):
+        """End-to-end time and queries of the zip and CSV exports for the tax year."""
+        from cis.models.customuser import CustomUser
+        from ...reports import filled_form1098 as filled_form_module
+        from ...reports import f1098_data_export as data_export_module
+
+        published_by = CustomUser.objects.filter(is_superuser=True).first()
+        task = SimpleNamespace(id='benchmark')
+        data = {
+            'created_on_from': [f'01/01/{tax_year}'],
+            'created_on_until': [f'01/01/{tax_year + 1}'],
+            'export_type': ['download'],
+            'published_by': [str(published_by.id) if published_by else ''],
+        }
+
+        metrics = {}
+        for name, module, report in (
+            ('filled_form1098', filled_form_module, filled_form_module.filled_form1098),
+            ('f1098_data_export', data_export_module, data_export_module.f1098_data_export),
+        ):
+            with self._memory_media_storage(module), CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                report().run(task, data)
+                elapsed = time.perf_counter() - started
+            metrics[f'reports.{name}.seconds'] = round(elapsed, 4)
+            metrics[f'reports.{name}.queries'] = len(queries)
+        return metrics
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _memory_media_storage(module):
+        """Point a report module's PrivateMediaStorage at MemoryStorage for the duration."""
+        original = module.PrivateMediaStorage
+        module.PrivateMediaStorage = MemoryStorage
+        try:
+            yield
+        finally:
+            module.PrivateMediaStorage = original
+
+    @staticmethod
+    def _latency_metrics(prefix, latencies):
+        if not latencies:
+            return {}
+        ordered = sorted(latencies)
+
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+        return {
+            f'{prefix}.p50_ms': round(percentile(50) * 1000, 3),
+            f'{prefix}.p95_ms': round(percentile(95) * 1000, 3),
+        }
+
+    @staticmethod
+    def _peak_rss_mb():
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+        return round(peak / divisor, 1)
+
+    def _print_results(self, metrics):
+        self.stdout.write(f"\n{'='*70}")
+        self.stdout.write("1098-T Benchmark")
+        self.stdout.write(f"{'='*70}")
+        for key in sorted(metrics):
+            self.stdout.write(f"  {key:<45} {metrics[key]}")
+        self.stdout.write("")
+
+    def _compare(self, metrics, baseline_path, threshold):
+        """Report changes against a saved baseline and fail on regressions."""
+        try:
+            with open(baseline_path) as f:
+                baseline = json.load(f)['metrics']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Could not read baseline {baseline_path}: {e}")
+
+        regressions = []
+        self.stdout.write(f"Compared with {baseline_path}:")
+        for key in sorted(set(metrics) & set(baseline)):
+            old, new = baseline[key], metrics[key]
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or not old:
+                continue
+            change = (new - old) / old * 100
+            # Throughput regresses when it drops; everything else when it grows
+            worse = -change if key.endswith('_per_sec') else change
+            line = f"  {key:<45} {old} -> {new} ({change:+.1f}%)"
+            if worse > threshold and not key.endswith(
+                ('.forms', '.students', '.published', '.errors', 'workers', 'mean_bytes')
+            ):
+                regressions.append(key)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} metric(s) regressed by more than {threshold}%")
+        self.stdout.write(self.style.SUCCESS("No regressions"))
@@ -2,6 +2,7 @@
 
 from django.core.management.base import BaseCommand
 from ...services.publisher import Form1098TPublisher
+from ...services.jobs import claim_run, resumable_runs
 from cis.models.customuser import CustomUser
 
 
@@ -20,11 +21,43 @@ class Command(BaseCommand):
             action='store_true',
             help='Regenerate existing published forms'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of processes used to fill PDFs (default: FORM_1098T_GENERATION_WORKERS or 1)'
+        )
+        parser.add_argument(
+            '--upload-workers',
+            type=int,
+            help='Number of threads used to upload PDFs (default: FORM_1098T_UPLOAD_WORKERS or 1)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild every form, even those whose inputs have not changed'
+        )
+        parser.add_argument(
+            '--plan',
+            action='store_true',
+            help='Report what a bulk publish would do without generating or storing forms'
+        )
+        parser.add_argument(
+            '--resume',
+            nargs='?',
+            const='latest',
+            metavar='RUN_ID',
+            help='Continue an unfinished publish run (default: the latest one for the tax year)'
+        )
     
     def handle(self, *args, **options):
         tax_year = options['tax_year']
         student_id = options.get('student_id')
         regenerate = options.get('regenerate', False)
+        workers = options.get('workers')
+        upload_workers = options.get('upload_workers')
+        resume = options.get('resume')
+        force = options.get('force', False)
+        plan = options.get('plan', False)
         
         # Get a system user for published_by
         system_user = CustomUser.objects.filter(is_superuser=True).first()
@@ -35,7 +68,9 @@ class Command(BaseCommand):
             )
             return
         
-        publisher = Form1098TPublisher(tax_year, system_user)
+        publisher = Form1098TPublisher(
+            tax_year, system_user, workers=workers, upload_workers=upload_workers
+        )
         
         if student_id:
             from cis.models.student import Student
@@ -49,18 +84,60 @@ class Command(BaseCommand):
                 self.stdout.write(
                     self.style.ERROR(f'Student with ID {student_id} not found')
                 )
+        elif plan:
+            self._write_plan(tax_year, publisher.plan())
         else:
-            self.stdout.write(f'Publishing forms for all students for {tax_year}...')
-            results = publisher.publish_all_students()
+            resume_run = None
+            if resume:
+                resume_run = self._get_resume_run(tax_year, resume)
+                if resume_run is None or not claim_run(resume_run):
+                    self.stdout.write(
+                        self.style.ERROR(f'No unfinished publish run found for {tax_year}')
+                    )
+                    return
+                self.stdout.write(
+                    f'Resuming publish run {resume_run.id} after '
+                    f'{resume_run.chunks_completed} completed chunk(s)...'
+                )
+            else:
+                self.stdout.write(f'Publishing forms for all students for {tax_year}...')
+            
+            results = publisher.publish_all_students(resume_run=resume_run, force=force)
             self.stdout.write(
                 self.style.SUCCESS(
                     f"Success: {results['success_count']}, "
+                    f"Unchanged: {results['unchanged_count']}, "
                     f"Skipped: {results['skipped_count']}, "
                     f"Errors: {results['error_count']}"
                 )
             )
+            self.stdout.write(f"Publish run: {results['run_id']}")
+            self.stdout.write(f"Elapsed: {results['elapsed_seconds']:.1f}s")
+            for stage, timing in results['stages'].items():
+                self.stdout.write(
+                    f"  {stage}: {timing['total_seconds']:.2f}s total over {timing['calls']} call(s), "
+                    f"mean {timing['mean_seconds'] * 1000:.1f}ms, p95 {timing['p95_seconds'] * 1000:.1f}ms"
+                )
             
             if results['errors']:
                 self.stdout.write(self.style.ERROR('\nErrors:'))
                 for error in results['errors']:
-                    self.stdout.write(f"  - {error['student_name']}: {error['error']}")
\ No newline at end of file
+                    self.stdout.write(f"  - {error['student_name']}: {error['error']}")
+    
+    def _write_plan(self, tax_year, plan):
+        self.stdout.write(f'Publish plan for {tax_year} (no forms generated):')
+        self.stdout.write(f"  Students with transactions: {plan['student_count']}")
+        self.stdout.write(f"  To publish: {plan['publish_count']} "
+                          f"({plan['new_count']} new, {plan['replace_count']} replacing published forms)")
+        self.stdout.write(f"  Unchanged (published form is up to date): {plan['unchanged_count']}")
+        self.stdout.write(f"  Published forms with changed amounts: {plan['amounts_changed_count']}")
+        self.stdout.write(f"  Skipped (no qualifying amounts): {plan['skipped_count']}")
+        self.stdout.write(f"  Box 1 total: ${plan['box1_total']:,.2f}")
+        self.stdout.write(f"  Box 5 total: ${plan['box5_total']:,.2f}")
+    
+    def _get_resume_run(self, tax_year, resume):
+        """Find the unfinished run to resume: a given ID, or the latest for the year."""
+        runs = resumable_runs(tax_year)
+        if resume != 'latest':
+            runs = runs.filter(id=resume)
+        return runs.first()
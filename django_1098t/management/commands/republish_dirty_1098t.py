@@ -0,0 +1,58 @@
+# django_1098t/management/commands/republish_dirty_1098t.py
+
+from django.core.management.base import BaseCommand
+from ...services.dirty import drain_dirty_students
+from cis.models.customuser import CustomUser
+
+
+class Command(BaseCommand):
+    """
+    python manage.py republish_dirty_1098t
+    python manage.py republish_dirty_1098t --tax-year 2025
+    """
+    help = 'Republish 1098-T forms for students whose transactions or details changed'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tax-year',
+            type=int,
+            help='Only republish this tax year (default: every year with changes)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of processes used to fill PDFs (default: FORM_1098T_GENERATION_WORKERS or 1)'
+        )
+    
+    def handle(self, *args, **options):
+        # Get a system user for published_by
+        system_user = CustomUser.objects.filter(is_superuser=True).first()
+        
+        if not system_user:
+            self.stdout.write(
+                self.style.ERROR('No superuser found. Please create one first.')
+            )
+            return
+        
+        results = drain_dirty_students(
+            system_user,
+            tax_year=options.get('tax_year'),
+            workers=options.get('workers')
+        )
+        
+        if not results:
+            self.stdout.write('No changed students to republish.')
+            return
+        
+        for tax_year, year_results in results.items():
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{tax_year}: Success: {year_results['success_count']}, "
+                    f"Unchanged: {year_results['unchanged_count']}, "
+                    f"Skipped: {year_results['skipped_count']}, "
+                    f"Unpublished: {year_results['unpublished_count']}, "
+                    f"Errors: {year_results['error_count']}"
+                )
+            )
+            for error in year_results['errors']:
+                self.stdout.write(f"  - {error['student_name']}: {error['error']}")
@@ -0,0 +1,27 @@
+# django_1098t/management/commands/sweep_1098t_storage.py
+
+from django.core.management.base import BaseCommand
+from ...services.storage import Form1098TStorage
+
+
+class Command(BaseCommand):
+    """
+    python manage.py sweep_1098t_storage
+    python manage.py sweep_1098t_storage --grace-hours 48
+    """
+    help = 'Delete content-addressed 1098-T files that no form needs any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            help='Keep files written or used within this many hours '
+                 '(default: FORM_1098T_CONTENT_SWEEP_GRACE_SECONDS or 24 hours)'
+        )
+
+    def handle(self, *args, **options):
+        grace_hours = options.get('grace_hours')
+        grace_seconds = grace_hours * 3600 if grace_hours is not None else None
+
+        deleted = Form1098TStorage().sweep_content(grace_seconds=grace_seconds)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {len(deleted)} unused 1098-T file(s)"))
@@ -25,10 +25,22 @@ class Command(BaseCommand):
             default='test_1098t.pdf',
             help='Output filename (default: test_1098t.pdf)'
         )
+        parser.add_argument(
+            '--engine',
+            choices=Form1098TGenerator.ENGINES,
+            help='Fill engine to use (default: FORM_1098T_FILL_ENGINE or pypdf)'
+        )
+        parser.add_argument(
+            '--check-parity',
+            action='store_true',
+            help='Also fill the test data with both engines and compare every field'
+        )
     
     def handle(self, *args, **options):
         year = options['year']
         output_filename = options['output']
+        engine = options.get('engine')
+        check_parity = options.get('check_parity', False)
         
         # Define test data
         test_data = {
@@ -68,7 +80,8 @@ class Command(BaseCommand):
             self.stdout.write(f"Template: {template_path}")
             
             # Initialize generator
-            generator = Form1098TGenerator(template_path)
+            generator = Form1098TGenerator(template_path, engine=engine)
+            self.stdout.write(f"Engine: {generator.engine}")
             
             # Display test data
             self.stdout.write("\nTest Data:")
@@ -104,6 +117,9 @@ class Command(BaseCommand):
             self.stdout.write(f"Saved to: {output_path}")
             self.stdout.write(f"\nOpen with: open {output_path}\n")
             
+            if check_parity:
+                self._check_parity(generator, test_data)
+            
         except FileNotFoundError as e:
             self.stdout.write(
                 self.style.ERROR(f"\n❌ Error: {str(e)}\n")
@@ -113,4 +129,26 @@ class Command(BaseCommand):
                 self.style.ERROR(f"\n❌ Error generating PDF: {str(e)}\n")
             )
             import traceback
-            traceback.print_exc()
\ No newline at end of file
+            traceback.print_exc()
+    
+    def _check_parity(self, generator, test_data):
+        """Compare the compiled engine against the pypdf path for the test data."""
+        from ...services.compiled import compare_with_pypdf
+        
+        self.stdout.write("Checking compiled engine parity...")
+        record = (
+            test_data['student_data'],
+            test_data['amounts'],
+            test_data['optional_amounts'],
+            test_data['checkboxes']
+        )
+        mismatches = compare_with_pypdf(generator, record)
+        
+        if mismatches:
+            self.stdout.write(
+                self.style.ERROR(f"❌ {len(mismatches)} field(s) differ: {', '.join(mismatches)}\n")
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS("✅ Compiled engine output matches pypdf field for field\n")
+            )
\ No newline at end of file
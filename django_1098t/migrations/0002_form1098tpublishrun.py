@@ -0,0 +1,47 @@
+# Generated by Django 4.2 on 2026-10-17 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('django_1098t', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Form1098TPublishRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tax_year', models.IntegerField()),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=20)),
+                ('student_ids', models.JSONField(blank=True, help_text='Students selected for this run; empty means every student with transactions in the year', null=True)),
+                ('last_student_id', models.CharField(blank=True, help_text='ID of the last student in the most recently committed chunk', max_length=64)),
+                ('chunks_completed', models.IntegerField(default=0)),
+                ('success_count', models.IntegerField(default=0)),
+                ('skipped_count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('elapsed_seconds', models.FloatField(default=0, help_text='Time spent publishing, summed over all attempts')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='form_1098t_publish_runs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': '1098-T Publish Run',
+                'verbose_name_plural': '1098-T Publish Runs',
+                'db_table': 'form_1098t_publish_run',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='form1098tpublishrun',
+            index=models.Index(fields=['tax_year', 'status'], name='form_1098t__tax_yea_5ae007_idx'),
+        ),
+    ]
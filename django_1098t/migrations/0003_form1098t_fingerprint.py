@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-17 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_1098t', '0002_form1098tpublishrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='form1098t',
+            name='fingerprint',
+            field=models.CharField(blank=True, help_text='Hash of the template, filer settings and student inputs the PDF was built from', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='form1098tpublishrun',
+            name='unchanged_count',
+            field=models.IntegerField(default=0, help_text='Students whose published form already matched their inputs'),
+        ),
+    ]
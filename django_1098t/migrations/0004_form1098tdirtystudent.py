@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-17 10:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_1098t', '0003_form1098t_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Form1098TDirtyStudent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tax_year', models.IntegerField()),
+                ('reason', models.CharField(max_length=50)),
+                ('marked_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='form_1098t_dirty_marks', to='cis.student')),
+            ],
+            options={
+                'verbose_name': '1098-T Dirty Student',
+                'verbose_name_plural': '1098-T Dirty Students',
+                'db_table': 'form_1098t_dirty_student',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='form1098tdirtystudent',
+            constraint=models.UniqueConstraint(fields=('student', 'tax_year'), name='unique_dirty_student_year'),
+        ),
+    ]
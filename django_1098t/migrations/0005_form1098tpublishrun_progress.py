@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_1098t', '0004_form1098tdirtystudent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='form1098tpublishrun',
+            name='student_count',
+            field=models.IntegerField(default=0, help_text='Number of students selected, counted when the run starts'),
+        ),
+        migrations.AddField(
+            model_name='form1098tpublishrun',
+            name='failure_reason',
+            field=models.TextField(blank=True, help_text='Why the run stopped, if it failed'),
+        ),
+    ]
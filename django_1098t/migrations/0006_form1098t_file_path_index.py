@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_1098t', '0005_form1098tpublishrun_progress'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='form1098t',
+            index=models.Index(fields=['file_path', 'is_published'], name='form_1098t_file_pa_19d77e_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-17 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_1098t', '0006_form1098t_file_path_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='form1098tpublishrun',
+            name='errors',
+            field=models.JSONField(blank=True, default=list, help_text='The first errors of the run; error_count counts them all'),
+        ),
+        migrations.AlterField(
+            model_name='form1098tpublishrun',
+            name='student_ids',
+            field=models.JSONField(blank=True, help_text='Students selected for this run; a run over every student with transactions in the year stores them when it starts', null=True),
+        ),
+    ]
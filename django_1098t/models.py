@@ -86,6 +86,11 @@ class Form1098T(models.Model):
         default=0,
         help_text="File size in bytes"
     )
+    fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Hash of the template, filer settings and student inputs the PDF was built from"
+    )
     
     # Publishing metadata
     is_published = models.BooleanField(
@@ -114,6 +119,7 @@ class Form1098T(models.Model):
         indexes = [
             models.Index(fields=['student', 'tax_year', 'is_published']),
             models.Index(fields=['tax_year', 'is_published']),
+            models.Index(fields=['file_path', 'is_published']),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -183,4 +189,190 @@ class Form1098TDownload(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.student} downloaded {self.form.tax_year} form at {self.downloaded_at}"
\ No newline at end of file
+        return f"{self.student} downloaded {self.form.tax_year} form at {self.downloaded_at}"
+
+
+class Form1098TPublishRun(models.Model):
+    """
+    Checkpoint record for a bulk publish, so an interrupted run can resume.
+    
+    Students are published in ID order, one chunk per transaction; each
+    committed chunk moves last_student_id forward in the same transaction.
+    The students are fixed when the run starts, so a resumed run covers the
+    same ones however the year's transactions changed since.
+    
+    errors keeps the first FORM_1098T_RUN_MAX_ERRORS (default 100) errors;
+    error_count counts them all.
+    """
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    # Errors stored on a run, unless configured
+    DEFAULT_MAX_ERRORS = 100
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tax_year = models.IntegerField()
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_RUNNING
+    )
+    student_ids = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Students selected for this run; a run over every student with transactions in the year stores them when it starts"
+    )
+    student_count = models.IntegerField(
+        default=0,
+        help_text="Number of students selected, counted when the run starts"
+    )
+    
+    # Progress
+    last_student_id = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="ID of the last student in the most recently committed chunk"
+    )
+    chunks_completed = models.IntegerField(default=0)
+    success_count = models.IntegerField(default=0)
+    skipped_count = models.IntegerField(default=0)
+    unchanged_count = models.IntegerField(
+        default=0,
+        help_text="Students whose published form already matched their inputs"
+    )
+    error_count = models.IntegerField(default=0)
+    errors = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="The first errors of the run; error_count counts them all"
+    )
+    failure_reason = models.TextField(
+        blank=True,
+        help_text="Why the run stopped, if it failed"
+    )
+    
+    # Timing
+    elapsed_seconds = models.FloatField(
+        default=0,
+        help_text="Time spent publishing, summed over all attempts"
+    )
+    started_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='form_1098t_publish_runs'
+    )
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'form_1098t_publish_run'
+        verbose_name = '1098-T Publish Run'
+        verbose_name_plural = '1098-T Publish Runs'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['tax_year', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"1098-T {self.tax_year} publish run {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+    
+    @property
+    def is_resumable(self):
+        return self.status != self.STATUS_COMPLETED
+    
+    def record_chunk(self, last_student_id, chunk_results, seconds):
+        """Add a committed chunk's counts and move the cursor past it."""
+        self.last_student_id = str(last_student_id)
+        self.chunks_completed += 1
+        self.success_count += chunk_results['success_count']
+        self.skipped_count += chunk_results['skipped_count']
+        self.unchanged_count += chunk_results['unchanged_count']
+        self.error_count += chunk_results['error_count']
+        self.elapsed_seconds += seconds
+        update_fields = [
+            'last_student_id', 'chunks_completed', 'success_count', 'skipped_count',
+            'unchanged_count', 'error_count', 'elapsed_seconds', 'updated_at'
+        ]
+        
+        # Only the first errors are kept, so the row stays small however many fail
+        room = getattr(settings, 'FORM_1098T_RUN_MAX_ERRORS', self.DEFAULT_MAX_ERRORS) - len(self.errors)
+        if room > 0 and chunk_results['errors']:
+            # Student IDs may be UUIDs, which JSONField cannot serialize
+            self.errors = self.errors + [
+                dict(error, student_id=str(error['student_id'])) for error in chunk_results['errors'][:room]
+            ]
+            update_fields.append('errors')
+        self.save(update_fields=update_fields)
+    
+    def finish(self, status, failure_reason=''):
+        self.status = status
+        self.failure_reason = failure_reason
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'failure_reason', 'finished_at', 'updated_at'])
+    
+    @property
+    def processed_count(self):
+        return self.success_count + self.unchanged_count + self.skipped_count + self.error_count
+    
+    def progress(self):
+        """Counts and estimated seconds remaining, for progress polling."""
+        processed = self.processed_count
+        remaining = max(self.student_count - processed, 0)
+        eta_seconds = None
+        if self.status == self.STATUS_RUNNING and processed:
+            eta_seconds = round(self.elapsed_seconds / processed * remaining, 1)
+        
+        return {
+            'id': str(self.id),
+            'tax_year': self.tax_year,
+            'status': self.status,
+            'total': self.student_count,
+            'processed': processed,
+            'published': self.success_count,
+            'unchanged': self.unchanged_count,
+            'skipped': self.skipped_count,
+            'errors': self.error_count,
+            'eta_seconds': eta_seconds,
+            'failure_reason': self.failure_reason,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class Form1098TDirtyStudent(models.Model):
+    """
+    A (student, tax year) whose published form may be out of date.
+    
+    Rows are added by the signal handlers in signals.py and removed by
+    services.dirty.drain_dirty_students once the student is republished.
+    """
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='form_1098t_dirty_marks'
+    )
+    tax_year = models.IntegerField()
+    reason = models.CharField(max_length=50)
+    marked_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'form_1098t_dirty_student'
+        verbose_name = '1098-T Dirty Student'
+        verbose_name_plural = '1098-T Dirty Students'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'tax_year'],
+                name='unique_dirty_student_year'
+            )
+        ]
+    
+    def __str__(self):
+        return f"{self.student} {self.tax_year} ({self.reason})"
@@ -4,10 +4,9 @@ import os, zipfile
 from io import BytesIO
 from django import forms
 from django.forms import ValidationError
-from django.http import HttpResponse
 from django.urls import reverse_lazy
 from django.db.models import Q, Prefetch
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from cis.backends.storage_backend import PrivateMediaStorage
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Submit
@@ -16,6 +15,7 @@ from student_transactions.models import StudentTransaction
 
 from decimal import Decimal
 from ..services.generator import Form1098TGenerator
+from ..services.parallel import generate_in_pool, get_generation_workers
 from ..settings.f1098 import f1098 as f1098_settings
 from ..constants import get_template_path
 
@@ -103,12 +103,12 @@ class filled_form1098(forms.Form):
 
         return records.values_list('student__id', flat=True).distinct()
 
-    def _generate_student_pdf(self, student, summary, f1098_generator):
+    def _build_student_record(self, student, summary):
         """
-        Generate a single student's 1098-T PDF form.
+        Build the generator record for a single student's 1098-T.
         
         Returns:
-            Tuple of (pdf_bytes, filled_form_path) or (None, None) if student has no transactions
+            Tuple of (record, filled_form_path) or (None, None) if student has no transactions
         """
 
         # Skip students with no transactions
@@ -137,17 +137,10 @@ class filled_form1098(forms.Form):
             'insurance_refund': 0.0
         }
         
-        filled_form_bytes = f1098_generator.generate_filled_form(
-            # filer_data=filer_data,
-            student_data=student_data,
-            amounts=amounts,
-            optional_amounts=optional_amounts
-        )
-        
         timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
         filled_form_path = f"f1098t_student_{student.user.last_name}_{student.user.first_name}_{student.user.id}_{timestamp}.pdf"
         
-        return filled_form_bytes, filled_form_path
+        return (student_data, amounts, optional_amounts), filled_form_path
 
     def _write_csv_row(self, writer, student, summary, filled_form_path):
         """Write a single CSV row for a student."""
@@ -235,33 +228,49 @@ class filled_form1098(forms.Form):
         storage = PrivateMediaStorage()
         path_prefix = f'reports/{datetime.datetime.now().strftime("%Y/%m")}/{task.id}/'
 
+        # Only students with qualifying transactions get a form
+        eligible = []
+        for student in students:
+            summary = summaries.get(student.id, {
+                'charges': Decimal('0.0'),
+                'payments': Decimal('0.0'),
+                'scholarships': Decimal('0.0')
+            })
+            record, filled_form_path = self._build_student_record(student, summary)
+            if record:
+                eligible.append((student, summary, record, filled_form_path))
+
         with zipfile.ZipFile(b, 'w', zipfile.ZIP_DEFLATED) as zf:  # Add compression
-            for student in students:
-                summary = summaries.get(student.id, {
-                    'charges': Decimal('0.0'),
-                    'payments': Decimal('0.0'),
-                    'scholarships': Decimal('0.0')
-                })
-                
-                # Generate PDF
-                filled_form_bytes, filled_form_path = self._generate_student_pdf(
-                    student, summary, f1098_generator
+            # Generate PDFs as one batch so the template setup is shared
+            records = (record for _, _, record, _ in eligible)
+            workers = get_generation_workers()
+            if workers > 1:
+                filled_forms = self._raise_pool_errors(
+                    generate_in_pool(f1098_generator, records, workers)
                 )
-                
-                if filled_form_bytes:  # Only process if student has transactions
-                    zf.writestr(filled_form_path, filled_form_bytes.getvalue())
-                    self._write_csv_row(writer, student, summary, filled_form_path)
+            else:
+                filled_forms = f1098_generator.generate_many(records)
+
+            for (student, summary, _, filled_form_path), filled_form_bytes in zip(eligible, filled_forms):
+                zf.writestr(filled_form_path, filled_form_bytes.getbuffer())
+                self._write_csv_row(writer, student, summary, filled_form_path)
             
             # Write CSV after all students processed
             zf.writestr('tax_form_exports.csv', stream.getvalue())
 
-        # Save to storage and return URL
-        response = HttpResponse(b.getvalue(), content_type="application/x-zip-compressed")
-        response['Content-Disposition'] = f'attachment; filename={ZIPFILE_NAME}'
-        
-        path = storage.save(path_prefix + ZIPFILE_NAME, ContentFile(response.getvalue()))
+        # Save the zip buffer itself to storage and return URL
+        b.seek(0)
+        path = storage.save(path_prefix + ZIPFILE_NAME, File(b, name=ZIPFILE_NAME))
         return storage.url(path)
     
+    @staticmethod
+    def _raise_pool_errors(generated):
+        """Unwrap pooled results, failing the export like the serial path does."""
+        for filled_form_bytes, error in generated:
+            if error:
+                raise RuntimeError(f"Error filling PDF: {error}")
+            yield filled_form_bytes
+    
     def _handle_publish(self, task, form_data, students, summaries, f1098_generator, writer, stream):
         """Handle individual file uploads to S3."""
         storage = PrivateMediaStorage()
@@ -0,0 +1,153 @@
+# django_1098t/services/backends.py
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage
+from django.utils import timezone
+from typing import Iterable, List, Set
+import threading
+
+
+# Keys per S3 DeleteObjects request, the API's maximum
+S3_DELETE_BATCH_SIZE = 1000
+
+
+def is_s3_storage(storage) -> bool:
+    """Whether storage is a django-storages S3 backend (e.g. PrivateMediaStorage)."""
+    return hasattr(storage, 'bucket') and hasattr(storage, '_normalize_name')
+
+
+def s3_delete_many(storage, names: Iterable[str]) -> List[str]:
+    """
+    Delete objects from an S3 storage with multi-object DeleteObjects
+    requests of up to 1000 keys. S3 reports missing keys as deleted.
+
+    Returns:
+        Names that S3 could not delete
+    """
+    from storages.utils import clean_name
+
+    keys = {storage._normalize_name(clean_name(name)): name for name in names}
+    ordered = list(keys)
+    failed = []
+    for start in range(0, len(ordered), S3_DELETE_BATCH_SIZE):
+        response = storage.bucket.delete_objects(Delete={
+            'Objects': [{'Key': key} for key in ordered[start:start + S3_DELETE_BATCH_SIZE]],
+            'Quiet': True
+        })
+        for error in response.get('Errors', []):
+            if error.get('Code') != 'NoSuchKey':
+                failed.append(keys.get(error.get('Key'), error.get('Key')))
+    return failed
+
+
+def s3_open_stream(storage, name: str):
+    """
+    Open an object of an S3 storage as botocore's StreamingBody, which reads
+    from the network as it goes; storage.open() downloads the whole object
+    into a temporary file first.
+    """
+    from storages.utils import clean_name
+
+    return storage.bucket.Object(storage._normalize_name(clean_name(name))).get()['Body']
+
+
+class LocalFileStorage(FileSystemStorage):
+    """
+    Stores forms on the local filesystem, under FORM_1098T_LOCAL_STORAGE_ROOT.
+
+    The root must be configured explicitly so forms never end up under a
+    publicly served MEDIA_ROOT by accident.
+    """
+
+    def __init__(self, location=None, **kwargs):
+        location = location or getattr(settings, 'FORM_1098T_LOCAL_STORAGE_ROOT', None)
+        if not location:
+            raise ImproperlyConfigured(
+                'FORM_1098T_LOCAL_STORAGE_ROOT must be set to use LocalFileStorage'
+            )
+        super().__init__(location=location, **kwargs)
+
+    def delete_many(self, names: Iterable[str]) -> List[str]:
+        """Delete files, returning the names that could not be deleted."""
+        failed = []
+        for name in names:
+            try:
+                self.delete(name)
+            except OSError:
+                failed.append(name)
+        return failed
+
+    def exists_many(self, names: Iterable[str]) -> Set[str]:
+        return {name for name in names if self.exists(name)}
+
+
+class MemoryStorage(Storage):
+    """
+    Keeps forms in a dict, for benchmarks, load tests and local development.
+
+    The dict belongs to the class, so every instance in a process sees the
+    same files (each Form1098TStorage builds its own backend instance) and
+    contents last as long as the process. Other processes don't see them.
+    Safe to use from upload threads.
+    """
+
+    files = {}
+    modified = {}
+    _lock = threading.Lock()
+
+    def _save(self, name, content):
+        data = content.read()
+        with self._lock:
+            self.files[name] = data
+            self.modified[name] = timezone.now()
+        return name
+
+    def _open(self, name, mode='rb'):
+        with self._lock:
+            if name not in self.files:
+                raise FileNotFoundError(name)
+            return ContentFile(self.files[name], name=name)
+
+    def exists(self, name):
+        return name in self.files
+
+    def delete(self, name):
+        with self._lock:
+            self.files.pop(name, None)
+            self.modified.pop(name, None)
+
+    def listdir(self, path):
+        prefix = f"{path.rstrip('/')}/" if path else ''
+        directories, files = set(), set()
+        with self._lock:
+            for name in self.files:
+                if name.startswith(prefix):
+                    head, separator, _ = name[len(prefix):].partition('/')
+                    (directories if separator else files).add(head)
+        return sorted(directories), sorted(files)
+
+    def size(self, name):
+        return len(self.files[name])
+
+    def get_modified_time(self, name):
+        with self._lock:
+            if name not in self.modified:
+                raise FileNotFoundError(name)
+            return self.modified[name]
+
+    def url(self, name):
+        return f"memory://{name}"
+
+    def delete_many(self, names: Iterable[str]) -> List[str]:
+        """Delete files, returning the names that could not be deleted (none)."""
+        with self._lock:
+            for name in names:
+                self.files.pop(name, None)
+                self.modified.pop(name, None)
+        return []
+
+    def exists_many(self, names: Iterable[str]) -> Set[str]:
+        with self._lock:
+            return {name for name in names if name in self.files}
@@ -0,0 +1,188 @@
+# django_1098t/services/cache.py
+
+from collections import OrderedDict
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from typing import Optional
+import hashlib
+import os
+import tempfile
+import threading
+
+
+# Total bytes kept by the read cache, unless configured
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# The process-wide cache built from settings, see get_form_cache()
+_form_cache = None
+_form_cache_lock = threading.Lock()
+
+
+def get_form_cache() -> Optional['FormCache']:
+    """
+    The read-through cache configured by FORM_1098T_READ_CACHE ('memory' or
+    'disk'), shared by every Form1098TStorage in the process, or None.
+    """
+    global _form_cache
+    kind = getattr(settings, 'FORM_1098T_READ_CACHE', None)
+    if not kind:
+        return None
+
+    with _form_cache_lock:
+        if _form_cache is None:
+            max_bytes = getattr(settings, 'FORM_1098T_READ_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+            if kind == 'memory':
+                _form_cache = MemoryFormCache(max_bytes)
+            elif kind == 'disk':
+                directory = getattr(
+                    settings,
+                    'FORM_1098T_READ_CACHE_DIR',
+                    os.path.join(tempfile.gettempdir(), 'django_1098t_cache')
+                )
+                _form_cache = DiskFormCache(directory, max_bytes)
+            else:
+                raise ImproperlyConfigured(
+                    f"FORM_1098T_READ_CACHE must be 'memory', 'disk' or None, not {kind!r}"
+                )
+        return _form_cache
+
+
+class FormCache:
+    """
+    A bounded LRU cache of form contents keyed by file path.
+
+    Stored forms never change under a given path (new versions get new
+    paths, and content-addressed paths always hold the same bytes), so
+    entries only need dropping when a path is deleted. Files larger than
+    max_entry_bytes are not cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max(max_bytes // 8, 1)
+
+    def get(self, file_path: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, file_path: str, content: bytes):
+        raise NotImplementedError
+
+    def delete(self, file_path: str):
+        raise NotImplementedError
+
+
+class MemoryFormCache(FormCache):
+    """Keeps cached forms in this process's memory."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(max_bytes)
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> Optional[bytes]:
+        with self._lock:
+            content = self._entries.get(file_path)
+            if content is not None:
+                self._entries.move_to_end(file_path)
+            return content
+
+    def set(self, file_path: str, content: bytes):
+        if len(content) > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(file_path, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[file_path] = bytes(content)
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def delete(self, file_path: str):
+        with self._lock:
+            content = self._entries.pop(file_path, None)
+            if content is not None:
+                self._size -= len(content)
+
+
+class DiskFormCache(FormCache):
+    """
+    Keeps cached forms as files in a local directory, which processes on the
+    same host can share.
+
+    Recency is the file's modification time, refreshed on every hit. When
+    this process's running total passes max_bytes, the directory is scanned
+    and the least recently used files are removed.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        super().__init__(max_bytes)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = self._scan_size()
+
+    def _entry_path(self, file_path: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(file_path.encode('utf-8')).hexdigest())
+
+    def get(self, file_path: str) -> Optional[bytes]:
+        entry_path = self._entry_path(file_path)
+        try:
+            with open(entry_path, 'rb') as f:
+                content = f.read()
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        return content
+
+    def set(self, file_path: str, content: bytes):
+        if len(content) > self.max_entry_bytes:
+            return
+        entry_path = self._entry_path(file_path)
+        # Write then rename, so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            print(f"Warning: Could not cache {file_path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        with self._lock:
+            self._size += len(content)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def delete(self, file_path: str):
+        try:
+            os.remove(self._entry_path(file_path))
+        except FileNotFoundError:
+            pass
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    def _evict(self):
+        """Remove the least recently used files until the cache fits in max_bytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, entry_path in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        self._size = size
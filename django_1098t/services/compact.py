@@ -0,0 +1,147 @@
+# django_1098t/services/compact.py
+
+from pypdf import PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    ByteStringObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+)
+from typing import Optional
+import hashlib
+import io
+import json
+import struct
+
+
+# Info entries that would make otherwise identical output differ between runs
+VOLATILE_INFO_KEYS = ('/CreationDate', '/ModDate')
+
+
+def document_id(*parts) -> bytes:
+    """Derive a stable 16-byte document ID from the inputs of a form."""
+    digest = hashlib.md5()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+    return digest.digest()
+
+
+def write_compact(writer: PdfWriter, output, doc_id: Optional[bytes] = None):
+    """
+    Serialize a writer as a compact, byte-stable PDF.
+
+    - Only objects reachable from the catalog and info dictionary are written,
+      so unused template objects are dropped.
+    - All non-stream objects are packed into one compressed object stream and
+      indexed by a compressed cross-reference stream (PDF 1.5).
+    - Uncompressed streams (e.g. freshly generated appearance streams) are
+      flate-encoded.
+    - The document ID is doc_id and volatile info dates are removed, so the
+      same inputs always give the same bytes.
+    """
+    objects = writer._objects
+    root_ref = writer.root_object.indirect_reference
+    info = writer._info.get_object() if getattr(writer, '_info', None) is not None else None
+    info_ref = getattr(info, 'indirect_reference', None)
+
+    if info is not None:
+        for key in VOLATILE_INFO_KEYS:
+            if key in info:
+                del info[key]
+
+    reachable = _reachable_objects(writer, [ref for ref in (root_ref, info_ref) if ref is not None])
+
+    output.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    entries = {}
+    packed = []
+
+    for idnum in sorted(reachable):
+        obj = objects[idnum - 1]
+        if isinstance(obj, StreamObject):
+            if '/Filter' not in obj:
+                obj = obj.flate_encode(level=9)
+            entries[idnum] = (1, output.tell(), 0)
+            output.write(f"{idnum} 0 obj\n".encode())
+            obj.write_to_stream(output)
+            output.write(b"\nendobj\n")
+        else:
+            buffer = io.BytesIO()
+            obj.write_to_stream(buffer)
+            packed.append((idnum, buffer.getvalue()))
+
+    object_stream_id = len(objects) + 1
+    xref_stream_id = object_stream_id + 1
+
+    # Object stream: "idnum offset" pairs followed by the packed objects
+    offsets, body, position = [], io.BytesIO(), 0
+    for index, (idnum, data) in enumerate(packed):
+        offsets.append(f"{idnum} {position}")
+        body.write(data + b"\n")
+        position += len(data) + 1
+        entries[idnum] = (2, object_stream_id, index)
+    header = (' '.join(offsets) + '\n').encode()
+
+    object_stream = StreamObject()
+    object_stream.set_data(header + body.getvalue())
+    object_stream.update({
+        NameObject('/Type'): NameObject('/ObjStm'),
+        NameObject('/N'): NumberObject(len(packed)),
+        NameObject('/First'): NumberObject(len(header)),
+    })
+    entries[object_stream_id] = (1, output.tell(), 0)
+    output.write(f"{object_stream_id} 0 obj\n".encode())
+    object_stream.flate_encode(level=9).write_to_stream(output)
+    output.write(b"\nendobj\n")
+
+    # Cross-reference stream; unreachable object numbers become free entries
+    xref_location = output.tell()
+    entries[xref_stream_id] = (1, xref_location, 0)
+    rows = [struct.pack('>BIH', 0, 0, 65535)]
+    for idnum in range(1, xref_stream_id + 1):
+        rows.append(struct.pack('>BIH', *entries.get(idnum, (0, 0, 0))))
+
+    trailer = {
+        NameObject('/Type'): NameObject('/XRef'),
+        NameObject('/Size'): NumberObject(xref_stream_id + 1),
+        NameObject('/W'): ArrayObject([NumberObject(1), NumberObject(4), NumberObject(2)]),
+        NameObject('/Root'): root_ref,
+    }
+    if info_ref is not None:
+        trailer[NameObject('/Info')] = info_ref
+    if doc_id is not None:
+        trailer[NameObject('/ID')] = ArrayObject([ByteStringObject(doc_id), ByteStringObject(doc_id)])
+
+    xref_stream = StreamObject()
+    xref_stream.set_data(b''.join(rows))
+    xref_stream.update(trailer)
+    output.write(f"{xref_stream_id} 0 obj\n".encode())
+    xref_stream.flate_encode(level=9).write_to_stream(output)
+    output.write(f"\nendobj\nstartxref\n{xref_location}\n%%EOF\n".encode())
+
+
+def _reachable_objects(writer: PdfWriter, roots) -> set:
+    """Object numbers reachable from the given indirect references."""
+    seen = set()
+    pending = [ref.idnum for ref in roots]
+
+    while pending:
+        idnum = pending.pop()
+        if idnum in seen or idnum > len(writer._objects) or writer._objects[idnum - 1] is None:
+            continue
+        seen.add(idnum)
+
+        stack = [writer._objects[idnum - 1]]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, IndirectObject):
+                if obj.idnum not in seen:
+                    pending.append(obj.idnum)
+            elif isinstance(obj, DictionaryObject):
+                stack.extend(obj.values())
+            elif isinstance(obj, ArrayObject):
+                stack.extend(obj)
+
+    return seen
@@ -0,0 +1,245 @@
+# django_1098t/services/compiled.py
+
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject, StreamObject
+from typing import Dict, List, Optional
+import io
+import os
+import threading
+from .generator import Form1098TGenerator
+
+
+# Compiled templates keyed by (absolute path, mtime), like the master cache
+_compiled_cache = {}
+_compiled_cache_lock = threading.Lock()
+
+
+def get_compiled_template(generator: Form1098TGenerator) -> 'CompiledTemplate':
+    """Return the compiled form of the generator's template, building it on first use."""
+    template_path = os.path.abspath(generator.template_path)
+    key = (template_path, os.stat(template_path).st_mtime_ns)
+
+    with _compiled_cache_lock:
+        compiled = _compiled_cache.get(key)
+        if compiled is None:
+            compiled = CompiledTemplate(generator)
+            for stale_key in [k for k in _compiled_cache if k[0] == template_path]:
+                del _compiled_cache[stale_key]
+            _compiled_cache[key] = compiled
+
+    return compiled
+
+
+def _detached_copy(obj):
+    """
+    Copy the direct structure of a PDF object, keeping indirect references.
+
+    Filling mutates annotation dictionaries in place but replaces appearance
+    streams wholesale, so streams are shared rather than copied.
+    """
+    if isinstance(obj, StreamObject):
+        return obj
+    if isinstance(obj, DictionaryObject):
+        return DictionaryObject({key: _detached_copy(value) for key, value in obj.items()})
+    if isinstance(obj, ArrayObject):
+        return ArrayObject(_detached_copy(value) for value in obj)
+    return obj
+
+
+def _serialize(obj) -> bytes:
+    buffer = io.BytesIO()
+    obj.write_to_stream(buffer)
+    return buffer.getvalue()
+
+
+class CompiledTemplate:
+    """
+    A 1098-T template compiled for fast filling.
+
+    Compiling serializes a pristine clone of the template once and records
+    the "slots": the objects that filling touches (widget annotations, their
+    parent fields, appearance streams and the AcroForm). A fill resets those
+    slots, lets pypdf write the values and appearances into them, and emits
+    the base document plus an incremental update holding only the slots.
+    Field values and appearance streams therefore come from the same pypdf
+    code as the regular path; only cloning and full serialization are skipped.
+    """
+
+    def __init__(self, generator: Form1098TGenerator):
+        self.generator = generator
+        self.annotation_lookup = generator.resolve_annotation_lookup()
+        self._lock = threading.Lock()
+
+        # Find the slots by filling a throwaway clone and diffing every object
+        trial = self._new_base_writer()
+        before = [_serialize(obj) if obj is not None else None for obj in trial._objects]
+        trial.update_page_form_field_values(
+            trial.pages[0],
+            {name: 'Yes' for name in self.annotation_lookup},
+            auto_regenerate=False
+        )
+        slots = {
+            idnum
+            for idnum, obj in enumerate(trial._objects[:len(before)], start=1)
+            if obj is not None and _serialize(obj) != before[idnum - 1]
+        }
+
+        self.writer = self._new_base_writer()
+        slots |= self._structural_slots(self.writer)
+
+        base = io.BytesIO()
+        self.writer.write(base)
+        self.base_bytes = base.getvalue()
+        self.base_object_count = len(self.writer._objects)
+        self.base_startxref = int(self.base_bytes.rsplit(b'startxref', 1)[1].split()[0])
+
+        base_trailer = PdfReader(io.BytesIO(self.base_bytes)).trailer
+        self.trailer_entries = {
+            key: base_trailer.raw_get(key)
+            for key in ('/Root', '/Info', '/ID')
+            if key in base_trailer
+        }
+
+        self.slots = sorted(slots)
+        self.pristine = {
+            idnum: _detached_copy(self.writer._objects[idnum - 1])
+            for idnum in self.slots
+        }
+
+    def _new_base_writer(self):
+        writer = self.generator._new_writer()
+        writer.set_need_appearances_writer(False)
+        return writer
+
+    def _structural_slots(self, writer) -> set:
+        """Widgets, parent fields, appearance streams and the AcroForm for every compiled field."""
+        slots = set()
+        annotations = writer.pages[0]['/Annots']
+        for indexes in self.annotation_lookup.values():
+            for index in indexes:
+                reference = annotations[index]
+                if isinstance(reference, IndirectObject):
+                    slots.add(reference.idnum)
+                annotation = reference.get_object()
+                parent = annotation.raw_get('/Parent') if '/Parent' in annotation else None
+                if isinstance(parent, IndirectObject):
+                    slots.add(parent.idnum)
+                appearance = annotation.get('/AP', {}).get('/N') if '/AP' in annotation else None
+                if appearance is not None and getattr(appearance, 'indirect_reference', None):
+                    slots.add(appearance.indirect_reference.idnum)
+
+        acro_form = writer.root_object.raw_get('/AcroForm')
+        if isinstance(acro_form, IndirectObject):
+            slots.add(acro_form.idnum)
+        return slots
+
+    def fill(self, field_data: Dict[str, str], doc_id: Optional[bytes] = None) -> io.BytesIO:
+        """
+        Fill the compiled slots with field_data and serialize the result.
+        
+        With a doc_id the whole document is rewritten in compact form instead
+        of appending an incremental update to the base.
+        """
+        with self._lock:
+            self._reset()
+            self.writer.update_page_form_field_values(
+                self.writer.pages[0],
+                field_data,
+                auto_regenerate=False
+            )
+            if doc_id is not None:
+                return Form1098TGenerator._write(self.writer, doc_id)
+            return self._write_increment()
+
+    def _reset(self):
+        """Put every slot back to its pristine state and drop added objects."""
+        objects = self.writer._objects
+        del objects[self.base_object_count:]
+        for idnum, pristine in self.pristine.items():
+            obj = _detached_copy(pristine)
+            obj.indirect_reference = IndirectObject(idnum, 0, self.writer)
+            objects[idnum - 1] = obj
+
+    def _write_increment(self) -> io.BytesIO:
+        objects = self.writer._objects
+        changed = self.slots + list(range(self.base_object_count + 1, len(objects) + 1))
+
+        output = io.BytesIO()
+        output.write(self.base_bytes)
+        if not self.base_bytes.endswith(b'\n'):
+            output.write(b'\n')
+
+        offsets = {}
+        for idnum in changed:
+            obj = objects[idnum - 1]
+            if obj is None:
+                continue
+            offsets[idnum] = output.tell()
+            output.write(f"{idnum} 0 obj\n".encode())
+            obj.write_to_stream(output)
+            output.write(b"\nendobj\n")
+
+        xref_location = output.tell()
+        output.write(b"xref\n")
+        for first, run in self._xref_sections(sorted(offsets)):
+            output.write(f"{first} {len(run)}\n".encode())
+            for idnum in run:
+                output.write(f"{offsets[idnum]:010d} 00000 n \n".encode())
+
+        trailer = DictionaryObject({
+            NameObject('/Size'): NumberObject(len(objects) + 1),
+            NameObject('/Prev'): NumberObject(self.base_startxref),
+        })
+        for key, value in self.trailer_entries.items():
+            trailer[NameObject(key)] = value
+        output.write(b"trailer\n")
+        trailer.write_to_stream(output)
+        output.write(f"\nstartxref\n{xref_location}\n%%EOF\n".encode())
+
+        output.seek(0)
+        return output
+
+    @staticmethod
+    def _xref_sections(idnums: List[int]):
+        """Group sorted object numbers into consecutive xref subsections."""
+        sections = []
+        for idnum in idnums:
+            if sections and sections[-1][1][-1] == idnum - 1:
+                sections[-1][1].append(idnum)
+            else:
+                sections.append((idnum, [idnum]))
+        return sections
+
+
+def compare_with_pypdf(generator: Form1098TGenerator, record) -> List[str]:
+    """
+    Fill one record through both engines and list every field whose value,
+    checkbox state or appearance stream differs. An empty list means parity.
+    """
+    student_data, amounts, optional_amounts, checkboxes = (tuple(record) + (None, None))[:4]
+    field_data = generator._build_field_data(student_data, amounts, optional_amounts, checkboxes)
+
+    writer = generator._new_writer()
+    writer.update_page_form_field_values(writer.pages[0], field_data, auto_regenerate=False)
+    expected = PdfReader(Form1098TGenerator._write(writer))
+    actual = PdfReader(get_compiled_template(generator).fill(field_data))
+
+    def describe(reader):
+        fields = {}
+        for annotation in reader.pages[0].get('/Annots') or []:
+            annotation = annotation.get_object()
+            field = annotation if '/T' in annotation else annotation.get('/Parent', DictionaryObject()).get_object()
+            appearance = annotation.get('/AP', {}).get('/N') if '/AP' in annotation else None
+            fields[str(field.get('/T'))] = (
+                field.get('/V'),
+                annotation.get('/AS'),
+                appearance.get_data() if isinstance(appearance, StreamObject) else None,
+            )
+        return fields
+
+    expected_fields, actual_fields = describe(expected), describe(actual)
+    return [
+        name
+        for name in sorted(set(expected_fields) | set(actual_fields))
+        if expected_fields.get(name) != actual_fields.get(name)
+    ]
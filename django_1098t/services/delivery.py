@@ -0,0 +1,69 @@
+# django_1098t/services/delivery.py
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from urllib.parse import quote
+from ..models import Form1098T
+from .storage import Form1098TStorage
+
+
+# proxy: stream the bytes through Django (default, works with any storage)
+# redirect: redirect to a short-lived presigned URL (S3 backends)
+# x-accel-redirect: let nginx serve FORM_1098T_ACCEL_REDIRECT_PREFIX + file path
+# x-sendfile: let Apache/lighttpd serve the file's local path (filesystem backends)
+DELIVERY_MODES = ('proxy', 'redirect', 'x-accel-redirect', 'x-sendfile')
+
+
+def get_delivery_mode() -> str:
+    """Resolve FORM_1098T_DELIVERY_MODE."""
+    mode = getattr(settings, 'FORM_1098T_DELIVERY_MODE', 'proxy')
+    if mode not in DELIVERY_MODES:
+        raise ImproperlyConfigured(
+            f"FORM_1098T_DELIVERY_MODE must be one of {', '.join(DELIVERY_MODES)}, not {mode!r}"
+        )
+    return mode
+
+
+def build_download_response(storage: Form1098TStorage, form: Form1098T, filename: str) -> HttpResponse:
+    """
+    Build the response that delivers a form's PDF, after access checks.
+
+    Offloaded modes hand the transfer to S3 or the web server. When the
+    storage can't serve the configured mode (no presigned URLs, no local
+    path), the form is proxied instead.
+
+    Raises:
+        Whatever the storage raises when the file can't be opened (proxy mode)
+    """
+    mode = get_delivery_mode()
+    disposition = f'attachment; filename="{filename}"'
+
+    if mode == 'redirect':
+        url = storage.signed_url(form.file_path, filename=filename)
+        if url:
+            response = HttpResponseRedirect(url)
+            # The URL is a credential, however short-lived
+            response['Cache-Control'] = 'private, no-store'
+            return response
+
+    elif mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'FORM_1098T_ACCEL_REDIRECT_PREFIX', '/protected-1098t/')
+        response = HttpResponse(content_type='application/pdf')
+        response['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{quote(form.file_path.lstrip('/'))}"
+        response['Content-Disposition'] = disposition
+        return response
+
+    elif mode == 'x-sendfile':
+        local_path = storage.local_path(form.file_path)
+        if local_path:
+            response = HttpResponse(content_type='application/pdf')
+            response['X-Sendfile'] = local_path
+            response['Content-Disposition'] = disposition
+            return response
+
+    response = StreamingHttpResponse(storage.iter_file_content(form.file_path), content_type='application/pdf')
+    response['Content-Disposition'] = disposition
+    if form.file_size:
+        response['Content-Length'] = form.file_size
+    return response
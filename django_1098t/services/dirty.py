@@ -0,0 +1,115 @@
+# django_1098t/services/dirty.py
+
+from contextlib import contextmanager
+from django.utils import timezone
+from typing import Dict, Iterable, Optional, Tuple
+from ..models import Form1098T, Form1098TDirtyStudent
+import threading
+
+
+# is_published_year answers, remembered on a thread for the current request
+# or remember_published_years() block
+_published_years = threading.local()
+
+
+def mark_dirty(pairs: Iterable[Tuple], reason: str):
+    """
+    Record (student_id, tax_year) pairs whose published forms need a rebuild.
+    
+    Re-marking a pair refreshes its marked_at, so a drain that started
+    before the change does not clear it.
+    """
+    for student_id, tax_year in set(pairs):
+        if student_id is None or tax_year is None:
+            continue
+        # update_or_create rather than an upsert, which needs Django 4.1
+        Form1098TDirtyStudent.objects.update_or_create(
+            student_id=student_id,
+            tax_year=tax_year,
+            defaults={'reason': reason}
+        )
+
+
+def is_published_year(tax_year: int) -> bool:
+    """
+    Whether any form has been published for the year.
+    
+    Inside a request or a remember_published_years() block each year is
+    queried once, so saving many transactions costs one query per year.
+    """
+    cache = getattr(_published_years, 'cache', None)
+    if cache is not None and tax_year in cache:
+        return cache[tax_year]
+    
+    published = Form1098T.objects.filter(tax_year=tax_year, is_published=True).exists()
+    if cache is not None:
+        cache[tax_year] = published
+    return published
+
+
+def start_published_year_cache():
+    """Remember is_published_year answers on this thread until cleared."""
+    _published_years.cache = {}
+
+
+def clear_published_year_cache():
+    _published_years.cache = None
+
+
+@contextmanager
+def remember_published_years():
+    """
+    Remember is_published_year answers inside the block, e.g. around a bulk
+    import of transactions run outside a request. Requests get this
+    automatically (see signals.py).
+    """
+    previous = getattr(_published_years, 'cache', None)
+    if previous is None:
+        start_published_year_cache()
+    try:
+        yield
+    finally:
+        _published_years.cache = previous
+
+
+def drain_dirty_students(published_by, tax_year: Optional[int] = None, workers: Optional[int] = None) -> Dict[int, Dict]:
+    """
+    Republish every dirty student and clear their marks.
+    
+    Students go through Form1098TPublisher.publish_all_students, so unchanged
+    inputs are skipped by fingerprint and each pass is a resumable run.
+    Students left without qualifying amounts are skipped by the publisher,
+    so their published forms are unpublished here. Marks of students that
+    failed, or that were marked again while the pass was running, are kept
+    for the next drain.
+    
+    Returns:
+        Publish results keyed by tax year, with unpublished_count added
+    """
+    from .publisher import Form1098TPublisher
+    
+    marks = Form1098TDirtyStudent.objects.all()
+    if tax_year is not None:
+        marks = marks.filter(tax_year=tax_year)
+    
+    results = {}
+    years = marks.values_list('tax_year', flat=True).distinct().order_by('tax_year')
+    for year in list(years):
+        year_marks = marks.filter(tax_year=year)
+        drain_started = timezone.now()
+        student_ids = list(year_marks.values_list('student_id', flat=True))
+        if not student_ids:
+            continue
+        
+        publisher = Form1098TPublisher(year, published_by, workers=workers)
+        year_results = publisher.publish_all_students(student_ids=student_ids)
+        year_results['unpublished_count'] = publisher.unpublish_unqualified(student_ids)
+        results[year] = year_results
+        
+        failed = {error['student_id'] for error in year_results['errors']}
+        year_marks.filter(
+            student_id__in=student_ids,
+            marked_at__lte=drain_started
+        ).exclude(student_id__in=failed).delete()
+    
+    return results
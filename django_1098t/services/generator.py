@@ -1,10 +1,87 @@
 # webapp/django_1098t/django_1098t/services/generator.py
 
 from pypdf import PdfReader, PdfWriter
-from typing import Dict, Optional
+from pypdf.generic import DictionaryObject
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import hashlib
 import io
+import json
+import os
+import threading
 import traceback
+from django.conf import settings
 from ..constants import get_filer_info  # Changed import
+from .compact import document_id, write_compact
+
+
+# Parsed templates keyed by (absolute path, mtime). Replacing a file in
+# templates_pdf/f1098t/ changes its mtime, so the next form picks it up.
+_template_cache = {}
+_template_hash_cache = {}
+_template_cache_lock = threading.Lock()
+
+
+def get_master_template(template_path: str) -> PdfReader:
+    """
+    Return the in-memory master copy of a 1098-T template.
+
+    The template is read and parsed once per (path, mtime) and held as a
+    PdfReader over an in-memory buffer, so filled forms can be cloned from
+    it without touching the disk again.
+    """
+    template_path = os.path.abspath(template_path)
+    key = (template_path, os.stat(template_path).st_mtime_ns)
+
+    with _template_cache_lock:
+        master = _template_cache.get(key)
+        if master is None:
+            writer = PdfWriter()
+            writer.append(PdfReader(template_path))
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            master = PdfReader(buffer)
+
+            # Drop entries for older versions of the same file
+            for stale_key in [k for k in _template_cache if k[0] == template_path]:
+                del _template_cache[stale_key]
+            _template_cache[key] = master
+
+    return master
+
+
+def get_template_hash(template_path: str) -> str:
+    """SHA-256 of a template file, computed once per (path, mtime)."""
+    template_path = os.path.abspath(template_path)
+    key = (template_path, os.stat(template_path).st_mtime_ns)
+    
+    with _template_cache_lock:
+        template_hash = _template_hash_cache.get(key)
+        if template_hash is None:
+            with open(template_path, 'rb') as f:
+                template_hash = hashlib.sha256(f.read()).hexdigest()
+            for stale_key in [k for k in _template_hash_cache if k[0] == template_path]:
+                del _template_hash_cache[stale_key]
+            _template_hash_cache[key] = template_hash
+    
+    return template_hash
+
+
+def _qualified_field_name(field) -> str:
+    """Return the dotted /T path of a field dictionary."""
+    parts = []
+    while field is not None:
+        if '/T' in field:
+            parts.append(str(field['/T']))
+        parent = field.get('/Parent')
+        field = parent.get_object() if parent is not None else None
+    return '.'.join(reversed(parts))
+
+
+def clear_template_cache():
+    """Forget all cached templates."""
+    with _template_cache_lock:
+        _template_cache.clear()
+        _template_hash_cache.clear()
 
 
 class Form1098TGenerator:
@@ -21,10 +98,42 @@ class Form1098TGenerator:
         'corrected_check': 'topmostSubform[0].CopyB[0].c2_1[0]',
     }
     
-    def __init__(self, template_path: str):
+    REQUIRED_FIELDS = (
+        'filer_name',
+        'service_provider_account_number',
+        'filer_ein',
+        'student_name',
+        'student_tin',
+        'student_address',
+        'student_address2',
+        'box1_payments',
+        'box5_scholarships',
+    )
+    
+    ENGINES = ('pypdf', 'compiled')
+    
+    def __init__(
+        self,
+        template_path: str,
+        filer_info: Optional[Dict[str, str]] = None,
+        engine: Optional[str] = None,
+        compact: Optional[bool] = None
+    ):
         self.template_path = template_path
-        # Get filer info once during initialization
-        self.filer_info = get_filer_info()
+        # Get filer info once during initialization; callers that cannot
+        # touch the database (e.g. pool workers) pass it in instead
+        self.filer_info = filer_info if filer_info is not None else get_filer_info()
+        
+        # 'compiled' fills a precompiled template instead of a full pypdf clone
+        self.engine = engine or getattr(settings, 'FORM_1098T_FILL_ENGINE', 'pypdf')
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Unknown 1098-T fill engine: {self.engine}")
+        
+        # Compact output packs objects into compressed streams and is
+        # byte-identical for identical inputs (see services.compact)
+        if compact is None:
+            compact = getattr(settings, 'FORM_1098T_COMPACT_OUTPUT', False)
+        self.compact = compact
     
     def generate_filled_form(
         self,
@@ -35,26 +144,13 @@ class Form1098TGenerator:
     ) -> io.BytesIO:
         """Generate a filled 1098-T PDF form and return as BytesIO object."""
         try:
-            reader = PdfReader(self.template_path)
-            writer = PdfWriter()
-            writer.append(reader)
-            
-            # Build field data
-            field_data = self._build_required_fields(student_data, amounts)
-            
-            # Add optional fields
-            if student_data.get('address2'):
-                field_data['student_address2'] = student_data['address2']
-            
-            # Use filer info from database
-            # field_data[self.OPTIONAL_FIELD_MAPPING['filer_address']] = self.filer_info['address']
-            
-            if optional_amounts:
-                self._add_optional_amounts(field_data, optional_amounts)
-            
-            if checkboxes:
-                self._add_checkboxes(field_data, checkboxes)
+            field_data = self._build_field_data(
+                student_data, amounts, optional_amounts, checkboxes
+            )
+            if self.engine == 'compiled':
+                return self._compiled_template().fill(field_data, self._document_id(field_data))
             
+            writer = self._new_writer()
             # Fill the form
             writer.update_page_form_field_values(
                 writer.pages[0],
@@ -62,18 +158,145 @@ class Form1098TGenerator:
                 auto_regenerate=False
             )
             
-            # Write to BytesIO
-            pdf_bytes = io.BytesIO()
-            writer.write(pdf_bytes)
-            pdf_bytes.seek(0)
-            
-            return pdf_bytes
+            return self._write(writer, self._document_id(field_data))
             
         except Exception as e:
             print(f"Error filling PDF: {e}")
             traceback.print_exc()
             raise
     
+    def generate_many(self, records: Iterable[Tuple]) -> Iterator[io.BytesIO]:
+        """
+        Generate filled 1098-T PDFs for a batch of students.
+        
+        Args:
+            records: Iterable of (student_data, amounts, optional_amounts,
+                checkboxes) tuples; the last two items may be omitted or None.
+        
+        Yields:
+            One BytesIO per record, in input order.
+        """
+        for record in records:
+            yield self.generate_record(record)
+    
+    def generate_record(self, record: Tuple) -> io.BytesIO:
+        """Generate the PDF for one (student_data, amounts, ...) record, as in generate_many()."""
+        student_data, amounts, optional_amounts, checkboxes = (
+            tuple(record) + (None, None)
+        )[:4]
+        return self.generate_filled_form(student_data, amounts, optional_amounts, checkboxes)
+    
+    def fingerprint(self, record: Tuple) -> str:
+        """
+        Hash of everything that determines a form's content: the template
+        file, the filer settings and the student's name, TIN, address and
+        amounts, as they are written into the fields.
+        
+        Args:
+            record: (student_data, amounts, optional_amounts, checkboxes)
+                tuple as accepted by generate_many()
+        """
+        student_data, amounts, optional_amounts, checkboxes = (
+            tuple(record) + (None, None)
+        )[:4]
+        field_data = self._build_field_data(
+            student_data, amounts, optional_amounts, checkboxes
+        )
+        digest = hashlib.sha256(get_template_hash(self.template_path).encode())
+        digest.update(json.dumps(field_data, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _build_field_data(
+        self,
+        student_data: Dict[str, str],
+        amounts: Dict[str, float],
+        optional_amounts: Optional[Dict[str, float]] = None,
+        checkboxes: Optional[Dict[str, bool]] = None
+    ) -> Dict[str, str]:
+        """Build the field name -> value mapping for one form."""
+        field_data = self._build_required_fields(student_data, amounts)
+        
+        # Add optional fields
+        if student_data.get('address2'):
+            field_data['student_address2'] = student_data['address2']
+        
+        # Use filer info from database
+        # field_data[self.OPTIONAL_FIELD_MAPPING['filer_address']] = self.filer_info['address']
+        
+        if optional_amounts:
+            self._add_optional_amounts(field_data, optional_amounts)
+        
+        if checkboxes:
+            self._add_checkboxes(field_data, checkboxes)
+        
+        return field_data
+    
+    def resolve_annotation_lookup(self) -> Dict[str, List[int]]:
+        """
+        Map each field this generator fills to the positions of its widget
+        annotations in the template page's /Annots array.
+        
+        Clones of the master template keep the same /Annots order, so the
+        positions are valid for every writer produced by _new_writer().
+        The compiled engine uses them to find the objects a fill touches.
+        """
+        wanted = set(self.REQUIRED_FIELDS) | set(self.OPTIONAL_FIELD_MAPPING.values())
+        master = get_master_template(self.template_path)
+        lookup = {}
+        
+        with _template_cache_lock:
+            annotations = master.pages[0].get('/Annots') or []
+            for index, annotation in enumerate(annotations):
+                annotation = annotation.get_object()
+                if annotation.get('/Subtype') != '/Widget':
+                    continue
+                if '/FT' in annotation and '/T' in annotation:
+                    field = annotation
+                else:
+                    field = annotation.get('/Parent', DictionaryObject()).get_object()
+                
+                # Match on both the short and fully qualified name, as pypdf does
+                for name in {field.get('/T'), _qualified_field_name(field)}:
+                    if name in wanted:
+                        lookup.setdefault(name, []).append(index)
+        
+        return lookup
+    
+    @staticmethod
+    def _write(writer: PdfWriter, doc_id: Optional[bytes] = None) -> io.BytesIO:
+        """
+        Serialize a filled writer to a BytesIO positioned at the start.
+        
+        With a doc_id the compact writer is used; see _document_id().
+        """
+        pdf_bytes = io.BytesIO()
+        if doc_id is not None:
+            write_compact(writer, pdf_bytes, doc_id)
+        else:
+            writer.write(pdf_bytes)
+        pdf_bytes.seek(0)
+        return pdf_bytes
+    
+    def _document_id(self, field_data: Dict[str, str]) -> Optional[bytes]:
+        """Stable document ID for compact output, or None when compact is off."""
+        if not self.compact:
+            return None
+        return document_id(os.path.basename(self.template_path), field_data)
+    
+    def _compiled_template(self):
+        """The compiled form of this generator's template (see services.compiled)."""
+        from .compiled import get_compiled_template
+        return get_compiled_template(self)
+    
+    def _new_writer(self) -> PdfWriter:
+        """Clone a fresh writer from the cached master template."""
+        master = get_master_template(self.template_path)
+        # The master reader shares one buffer, so clones must not interleave
+        with _template_cache_lock:
+            writer = PdfWriter(clone_from=master)
+        writer.pdf_header = master.pdf_header
+        return writer
+    
     def _build_required_fields(
         self,
         student_data: Dict[str, str],
@@ -0,0 +1,142 @@
+# django_1098t/services/jobs.py
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from typing import Optional
+import threading
+import traceback
+from ..models import Form1098TPublishRun
+from ..workers import init_worker, spawn_context
+
+
+# A running run without a checkpoint for this long is assumed abandoned
+# (its worker crashed or was restarted), so it may be resumed
+DEFAULT_STALE_RUN_SECONDS = 3600
+
+# Executors for the built-in runners, created on first use
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def start_publish_job(tax_year: int, published_by, resume_run: Optional[Form1098TPublishRun] = None) -> Form1098TPublishRun:
+    """
+    Queue a bulk publish and return its run straight away.
+
+    The run's ID is the job ID; its progress() is updated after every chunk.
+    FORM_1098T_JOB_RUNNER picks where the job runs:
+
+    - 'thread' (default): a background thread in this process
+    - 'process': a separate worker process
+    - a dotted path to a callable taking (func_path, *args), for handing
+      the job to an external queue such as Celery or RQ; it must call
+      the function at func_path with args
+
+    The job is handed over once the current transaction commits, so it
+    never looks for a run that isn't visible yet (e.g. under ATOMIC_REQUESTS).
+
+    Raises:
+        ValueError: resume_run is completed or another job is running it
+    """
+    if resume_run is None:
+        run = Form1098TPublishRun.objects.create(
+            tax_year=tax_year,
+            started_by=published_by
+        )
+    else:
+        if not claim_run(resume_run):
+            raise ValueError(f"Publish run {resume_run.id} is already running or completed")
+        run = resume_run
+
+    args = (str(run.id), published_by.pk if published_by else None)
+    runner = getattr(settings, 'FORM_1098T_JOB_RUNNER', 'thread')
+    if runner in ('thread', 'process'):
+        transaction.on_commit(lambda: _get_executor(runner).submit(run_publish_job, *args))
+    else:
+        transaction.on_commit(lambda: import_string(runner)(f'{__name__}.run_publish_job', *args))
+
+    return run
+
+
+def claim_run(run: Form1098TPublishRun) -> bool:
+    """
+    Mark a resumable run as running with a conditional update, so two
+    callers can't both resume it. Reloads run when claimed.
+
+    Returns:
+        Whether the run was claimed
+    """
+    claimed = resumable_runs(run.tax_year).filter(id=run.id).update(
+        status=Form1098TPublishRun.STATUS_RUNNING,
+        finished_at=None,
+        updated_at=timezone.now()
+    )
+    if claimed:
+        run.refresh_from_db()
+    return bool(claimed)
+
+
+def resumable_runs(tax_year: int):
+    """
+    Unfinished runs of the year that no job is working on, newest first.
+    A running run counts once it has gone FORM_1098T_STALE_RUN_SECONDS
+    without a checkpoint.
+    """
+    stale_before = timezone.now() - timedelta(
+        seconds=getattr(settings, 'FORM_1098T_STALE_RUN_SECONDS', DEFAULT_STALE_RUN_SECONDS)
+    )
+    return Form1098TPublishRun.objects.filter(tax_year=tax_year).exclude(
+        status=Form1098TPublishRun.STATUS_COMPLETED
+    ).exclude(
+        status=Form1098TPublishRun.STATUS_RUNNING,
+        updated_at__gte=stale_before
+    ).order_by('-started_at')
+
+
+def run_publish_job(run_id: str, published_by_id=None):
+    """Publish (or resume) the run with the given ID; the body of a publish job."""
+    from django.contrib.auth import get_user_model
+    from .publisher import Form1098TPublisher
+
+    close_old_connections()
+    try:
+        run = Form1098TPublishRun.objects.get(id=run_id)
+        published_by = get_user_model().objects.filter(pk=published_by_id).first()
+        publisher = Form1098TPublisher(run.tax_year, published_by)
+        publisher.publish_all_students(resume_run=run)
+    except Exception as e:
+        # publish_all_students marks the run failed; this covers setup errors
+        print(f"Error in 1098-T publish job {run_id}: {e}")
+        traceback.print_exc()
+        Form1098TPublishRun.objects.filter(
+            id=run_id,
+            status=Form1098TPublishRun.STATUS_RUNNING
+        ).update(status=Form1098TPublishRun.STATUS_FAILED, failure_reason=str(e))
+    finally:
+        # Connections are per thread; don't leave this job's open
+        connections.close_all()
+
+
+def _get_executor(runner: str):
+    with _executors_lock:
+        executor = _executors.get(runner)
+        if executor is None:
+            workers = getattr(settings, 'FORM_1098T_JOB_WORKERS', 1)
+            if runner == 'process':
+                # Spawned workers set Django up from scratch instead of
+                # inheriting this process's database connections
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=spawn_context(),
+                    initializer=init_worker
+                )
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix='form1098t-job'
+                )
+            _executors[runner] = executor
+    return executor
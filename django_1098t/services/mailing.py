@@ -0,0 +1,319 @@
+# django_1098t/services/mailing.py
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NullObject,
+    NumberObject,
+    StreamObject,
+)
+from typing import Iterable, List, Optional, Tuple
+import hashlib
+import io
+
+
+# Annotation flag hiding an annotation from display and print (PDF 32000-1, table 165)
+ANNOTATION_FLAG_HIDDEN = 1 << 1
+
+
+class Form1098TMailingBuilder:
+    """
+    Builds one print-ready PDF holding many published 1098-T forms.
+
+    Each form is taken from its stored PDF and flattened: the output page
+    draws the form's page, embedded as a form XObject, and its widgets'
+    appearance streams at their rectangles, so the printed copy is exactly
+    the published one. Objects shared between forms, such as the template
+    page and fonts, are written once. Pages are written to the output as
+    they are produced, so memory stays bounded by the shared objects plus
+    one offset per object.
+    """
+
+    def build(self, forms: Iterable, output) -> int:
+        """
+        Write all forms as a single multi-page PDF.
+
+        Args:
+            forms: Iterable of filled form PDFs, as bytes or binary
+                file-like objects, already in mailing order
+            output: Binary file-like object to write to
+
+        Returns:
+            Number of pages written
+        """
+        base = PdfWriter()
+        pages_ref = base.root_object['/Pages'].indirect_reference
+
+        output.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        writer = _ObjectWriter(output, base, len(base._objects) + 1)
+
+        # The catalog; the page tree is written last, once all kids are known
+        for idnum, obj in enumerate(base._objects, start=1):
+            if obj is None or idnum == pages_ref.idnum:
+                continue
+            writer.write(idnum, obj)
+
+        kids = ArrayObject()
+
+        for form in forms:
+            filled = PdfReader(io.BytesIO(form) if isinstance(form, (bytes, bytearray)) else form)
+            page = filled.pages[0]
+            media_box = ArrayObject(list(page.mediabox))
+            xobjects = DictionaryObject({NameObject('/Page'): writer.copy(self._page_xobject(page, media_box))})
+            operations = ['q /Page Do Q']
+
+            for appearance, placement in self._widget_appearances(filled):
+                name = NameObject(f'/W{len(xobjects)}')
+                xobjects[name] = writer.copy(appearance)
+                operations.append(f"q {placement} cm {name} Do Q")
+
+            content = StreamObject()
+            content.set_data('\n'.join(operations).encode('latin-1'))
+            content_ref = writer.add(content.flate_encode())
+
+            kids.append(writer.add(DictionaryObject({
+                NameObject('/Type'): NameObject('/Page'),
+                NameObject('/Parent'): pages_ref,
+                NameObject('/MediaBox'): media_box,
+                NameObject('/Resources'): DictionaryObject({NameObject('/XObject'): xobjects}),
+                NameObject('/Contents'): content_ref,
+            })))
+
+        pages = DictionaryObject({
+            NameObject('/Type'): NameObject('/Pages'),
+            NameObject('/Kids'): kids,
+            NameObject('/Count'): NumberObject(len(kids)),
+        })
+        writer.write(pages_ref.idnum, pages)
+
+        writer.write_xref_and_trailer()
+        return len(kids)
+
+    @staticmethod
+    def _page_xobject(page, media_box) -> StreamObject:
+        """
+        The page's own content, without its annotations, as a form XObject.
+
+        Forms filled from the same template produce identical XObjects,
+        which _ObjectWriter.copy writes only once.
+        """
+        xobject = StreamObject()
+        xobject.set_data(page.get_contents().get_data())
+        xobject.update({
+            NameObject('/Type'): NameObject('/XObject'),
+            NameObject('/Subtype'): NameObject('/Form'),
+            NameObject('/BBox'): media_box,
+            NameObject('/Resources'): page.get('/Resources', DictionaryObject()),
+        })
+        return xobject.flate_encode()
+
+    @classmethod
+    def _widget_appearances(cls, filled: PdfReader) -> List[Tuple[StreamObject, str]]:
+        """
+        The normal appearance stream of every visible widget on the filled
+        form's page, with the matrix placing it on the widget's rectangle.
+        """
+        acro_form = filled.trailer['/Root'].get('/AcroForm')
+        default_resources = acro_form.get_object().get('/DR') if acro_form else None
+        appearances = []
+
+        for annotation in filled.pages[0].get('/Annots') or []:
+            annotation = annotation.get_object()
+            if annotation.get('/Subtype') != '/Widget':
+                continue
+            if int(annotation.get('/F', 0)) & ANNOTATION_FLAG_HIDDEN:
+                continue
+
+            appearance = (annotation.get('/AP') or {}).get('/N')
+            appearance = appearance.get_object() if appearance is not None else None
+            if appearance is not None and not isinstance(appearance, StreamObject):
+                # Checkboxes keep one appearance per state, selected by /AS
+                state = annotation.get('/AS')
+                appearance = appearance.get(state) if state is not None else None
+                appearance = appearance.get_object() if appearance is not None else None
+            if not isinstance(appearance, StreamObject):
+                continue
+
+            placement = cls._placement(appearance, annotation['/Rect'])
+            if placement is None:
+                continue
+
+            if '/Resources' not in appearance and default_resources is not None:
+                # Appearance streams may rely on the form's default resources
+                with_resources = StreamObject()
+                with_resources._data = appearance._data
+                with_resources.update(appearance)
+                with_resources[NameObject('/Resources')] = default_resources
+                appearance = with_resources
+
+            appearances.append((appearance, placement))
+
+        return appearances
+
+    @staticmethod
+    def _placement(appearance: StreamObject, rect) -> Optional[str]:
+        """
+        The cm operands mapping the appearance's transformed bounding box onto
+        the annotation rectangle (PDF 32000-1, 12.5.5), or None if either is empty.
+        """
+        x0, x1 = sorted((float(rect[0]), float(rect[2])))
+        y0, y1 = sorted((float(rect[1]), float(rect[3])))
+        bx0, by0, bx1, by1 = [float(value) for value in appearance.get('/BBox', [0, 0, x1 - x0, y1 - y0])]
+        a, b, c, d, e, f = [float(value) for value in appearance.get('/Matrix', [1, 0, 0, 1, 0, 0])]
+
+        corners = [(a * x + c * y + e, b * x + d * y + f) for x in (bx0, bx1) for y in (by0, by1)]
+        tx0, tx1 = min(x for x, _ in corners), max(x for x, _ in corners)
+        ty0, ty1 = min(y for _, y in corners), max(y for _, y in corners)
+        if tx1 == tx0 or ty1 == ty0 or x1 == x0 or y1 == y0:
+            return None
+
+        sx = (x1 - x0) / (tx1 - tx0)
+        sy = (y1 - y0) / (ty1 - ty0)
+        # Do applies the appearance's own /Matrix first
+        return f"{sx:.6g} 0 0 {sy:.6g} {x0 - sx * tx0:.6g} {y0 - sy * ty0:.6g}"
+
+
+class _ObjectWriter:
+    """
+    Writes numbered objects straight to the output and keeps their offsets
+    for the cross-reference table.
+
+    Objects copied from the filled forms are deduplicated by their
+    serialized content, so fonts and identical appearances shared by many
+    forms are written once.
+    """
+
+    def __init__(self, output, base: PdfWriter, next_idnum: int):
+        self.output = output
+        self.base = base
+        self.next_idnum = next_idnum
+        self.offsets = {}
+        self._copied = {}
+        self._copying = set()
+
+    def write(self, idnum: int, obj):
+        self.offsets[idnum] = self.output.tell()
+        self.output.write(f"{idnum} 0 obj\n".encode())
+        obj.write_to_stream(self.output)
+        self.output.write(b"\nendobj\n")
+
+    def add(self, obj) -> IndirectObject:
+        """Write obj under the next free object number."""
+        reference = IndirectObject(self.next_idnum, 0, self.base)
+        self.next_idnum += 1
+        self.write(reference.idnum, obj)
+        return reference
+
+    def copy(self, obj) -> IndirectObject:
+        """Write obj and everything it references, reusing identical objects already written."""
+        copied = self._copy_direct(obj)
+        serialized = io.BytesIO()
+        copied.write_to_stream(serialized)
+        key = hashlib.sha256(serialized.getvalue()).digest()
+
+        reference = self._copied.get(key)
+        if reference is None:
+            reference = self.add(copied)
+            self._copied[key] = reference
+        return reference
+
+    def _copy_direct(self, obj):
+        if isinstance(obj, IndirectObject):
+            key = (id(obj.pdf), obj.idnum)
+            if key in self._copying:
+                # Reference cycles never occur in appearance resources
+                return NullObject()
+            self._copying.add(key)
+            try:
+                return self.copy(obj.get_object())
+            finally:
+                self._copying.discard(key)
+
+        if isinstance(obj, StreamObject):
+            copied = StreamObject()
+            # Keep the encoded data, so /Filter and friends stay valid
+            copied._data = obj._data
+            for key, value in obj.items():
+                if key != '/Length':
+                    copied[NameObject(key)] = self._copy_direct(value)
+            return copied
+
+        if isinstance(obj, DictionaryObject):
+            return DictionaryObject({
+                NameObject(key): self._copy_direct(value) for key, value in obj.items()
+            })
+
+        if isinstance(obj, ArrayObject):
+            return ArrayObject([self._copy_direct(value) for value in obj])
+
+        return obj
+
+    def write_xref_and_trailer(self):
+        size = self.next_idnum
+        xref_location = self.output.tell()
+        self.output.write(f"xref\n0 {size}\n".encode())
+        self.output.write(b"0000000000 65535 f \n")
+        for idnum in range(1, size):
+            offset = self.offsets.get(idnum)
+            if offset is None:
+                self.output.write(b"0000000000 00001 f \n")
+            else:
+                self.output.write(f"{offset:010d} 00000 n \n".encode())
+
+        trailer = DictionaryObject({
+            NameObject('/Size'): NumberObject(size),
+            NameObject('/Root'): self.base.root_object.indirect_reference,
+        })
+        self.output.write(b"trailer\n")
+        trailer.write_to_stream(self.output)
+        self.output.write(f"\nstartxref\n{xref_location}\n%%EOF\n".encode())
+
+
+def _postal_code(address: str) -> str:
+    """The ZIP code at the end of a stored student_address ("street, city, ST 12345")."""
+    parts = (address or '').rsplit(',', 1)
+    if len(parts) < 2:
+        return ''
+    return parts[-1].strip().rpartition(' ')[2]
+
+
+def build_paper_mailing(tax_year: int, output) -> int:
+    """
+    Write every published form for students without electronic consent into
+    one print-ready PDF, ordered by postal code.
+
+    Pages are built from the stored published PDFs, and the postal code is
+    read from each form's address snapshot, so the paper copy and its place
+    in the mailing match what was published even if the student's record or
+    the filer settings changed since.
+
+    Returns:
+        Number of pages written
+    """
+    from ..constants import has_electronic_consent
+    from ..models import Form1098T
+    from .storage import Form1098TStorage
+
+    forms = Form1098T.objects.filter(
+        tax_year=tax_year,
+        is_published=True
+    ).select_related('student').only(
+        'student__meta', 'student_name', 'student_address', 'file_path'
+    )
+
+    mailing = sorted(
+        (
+            (_postal_code(form.student_address), form.student_name, form.file_path)
+            for form in forms.iterator(chunk_size=500)
+            if not has_electronic_consent(form.student)
+        ),
+        # Forms without a postal code go last
+        key=lambda row: (not row[0], row)
+    )
+
+    storage = Form1098TStorage()
+    pdfs = (storage.get_file_content(file_path) for _, _, file_path in mailing)
+    return Form1098TMailingBuilder().build(pdfs, output)
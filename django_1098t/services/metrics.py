@@ -0,0 +1,87 @@
+# django_1098t/services/metrics.py
+
+from contextlib import contextmanager
+from django.conf import settings
+from django.utils.module_loading import import_string
+from typing import Callable, Dict, Optional
+import threading
+import time
+
+
+def get_metrics_hook() -> Optional[Callable]:
+    """
+    Resolve FORM_1098T_METRICS_HOOK, a dotted path to a callable taking
+    (stage, seconds, count), e.g. to forward stage timings to StatsD.
+    """
+    hook = getattr(settings, 'FORM_1098T_METRICS_HOOK', None)
+    if isinstance(hook, str):
+        hook = import_string(hook)
+    return hook
+
+
+def percentile(values, p: float) -> float:
+    """Nearest-rank percentile of values (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+class StageTimings:
+    """
+    Wall-clock timings of the stages of a publish run.
+
+    Each sample is one timed call covering count forms (a summary query
+    covers a chunk, an upload one form). Samples may be recorded from
+    several threads. Every sample is also passed to the metrics hook;
+    errors raised by the hook are printed and otherwise ignored.
+    """
+
+    def __init__(self, hook: Optional[Callable] = None):
+        self.hook = hook
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def time(self, stage: str, count: int = 1):
+        """Time the body of the with block as one sample of stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started, count)
+
+    def record(self, stage: str, seconds: float, count: int = 1):
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+            self._counts[stage] = self._counts.get(stage, 0) + count
+
+        if self.hook is not None:
+            try:
+                self.hook(stage, seconds, count)
+            except Exception as e:
+                print(f"Warning: 1098-T metrics hook failed for {stage}: {e}")
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Per-stage totals.
+
+        Returns:
+            Dictionary keyed by stage with calls, items, total_seconds,
+            mean_seconds and p95_seconds (mean and p95 per call)
+        """
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self._samples.items()}
+            counts = dict(self._counts)
+
+        return {
+            stage: {
+                'calls': len(values),
+                'items': counts[stage],
+                'total_seconds': round(sum(values), 4),
+                'mean_seconds': round(sum(values) / len(values), 4),
+                'p95_seconds': round(percentile(values, 95), 4)
+            }
+            for stage, values in samples.items()
+        }
@@ -0,0 +1,94 @@
+# django_1098t/services/parallel.py
+
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+import io
+from django.conf import settings
+from .generator import Form1098TGenerator
+from ..workers import init_worker, spawn_context
+
+
+# Records sent to a worker per task; large enough to amortize pickling,
+# small enough to keep every worker busy near the end of a run
+DEFAULT_BATCH_SIZE = 25
+
+# Per-process state, set up once by _init_worker
+_worker_generator = None
+
+
+def get_generation_workers(workers: Optional[int] = None) -> int:
+    """Resolve the worker count, falling back to FORM_1098T_GENERATION_WORKERS."""
+    if workers is None:
+        workers = getattr(settings, 'FORM_1098T_GENERATION_WORKERS', 1)
+    return max(int(workers or 1), 1)
+
+
+def _init_worker(template_path: str, filer_info: Dict[str, str], engine: str, compact: bool):
+    """Warm a generator in each worker process."""
+    global _worker_generator
+    _worker_generator = Form1098TGenerator(
+        template_path, filer_info=filer_info, engine=engine, compact=compact
+    )
+
+
+def _generate_batch(records) -> list:
+    """Fill a batch of records in a worker; failures are reported per record."""
+    results = []
+    for record in records:
+        try:
+            pdf_bytes = _worker_generator.generate_record(record)
+            results.append((pdf_bytes.getvalue(), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
+def generate_in_pool(
+    generator: Form1098TGenerator,
+    records: Iterable[Tuple],
+    workers: int,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[Tuple[Optional[io.BytesIO], Optional[str]]]:
+    """
+    Fill records across a pool of worker processes.
+    
+    Each worker builds its own generator from generator's template and filer
+    info, so workers never touch the database. Batches are submitted a few
+    at a time ahead of the consumer, which keeps memory bounded on large runs.
+    Workers are spawned rather than forked (see django_1098t.workers).
+    
+    Yields:
+        (pdf_bytes, None) or (None, error message) per record, in input order.
+    """
+    records = iter(records)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=spawn_context(),
+        initializer=init_worker,
+        initargs=(
+            f'{__name__}._init_worker',
+            generator.template_path,
+            generator.filer_info,
+            generator.engine,
+            generator.compact
+        )
+    ) as pool:
+        pending = deque()
+        
+        def submit_next():
+            batch = list(islice(records, batch_size))
+            if batch:
+                pending.append(pool.submit(_generate_batch, batch))
+            return bool(batch)
+        
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+        
+        while pending:
+            results = pending.popleft().result()
+            submit_next()
+            for data, error in results:
+                yield (io.BytesIO(data) if data is not None else None), error
@@ -1,73 +1,533 @@
 # django_1098t/services/publisher.py
 
 from datetime import datetime
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 from student_transactions.models import StudentTransaction
 from cis.models.student import Student
-from ..models import Form1098T
+from ..models import Form1098T, Form1098TPublishRun
 from ..services.generator import Form1098TGenerator
 from ..constants import get_template_path
 from ..services.storage import Form1098TStorage
-from typing import Dict
+from ..services.parallel import generate_in_pool, get_generation_workers
+from ..services.uploads import UploadPool, get_upload_workers
+from ..services.metrics import StageTimings, get_metrics_hook
+from typing import Dict, Optional
+from decimal import Decimal
+import io
+import itertools
+import time
 
 
 class Form1098TPublisher:
     """Handles publishing 1098-T forms for students."""
     
-    def __init__(self, tax_year: int, published_by):
+    def __init__(
+        self,
+        tax_year: int,
+        published_by,
+        workers: Optional[int] = None,
+        upload_workers: Optional[int] = None
+    ):
         self.tax_year = tax_year
         self.published_by = published_by
         self.storage = Form1098TStorage()
+        # More than one worker fills PDFs in a process pool during bulk runs
+        self.workers = get_generation_workers(workers)
+        # More than one upload worker stores PDFs on a thread pool in bulk runs
+        self.upload_workers = get_upload_workers(upload_workers)
+        # Students whose summaries are fetched together in bulk runs
+        self.chunk_size = getattr(settings, 'FORM_1098T_PUBLISH_CHUNK_SIZE', 500)
+        # Form1098TPublishRun checkpointed by the bulk run in progress
+        self.run = None
+        # Replaced files of committed chunks, deleted in batches by a DeleteQueue
+        self.delete_batch_size = getattr(settings, 'FORM_1098T_DELETE_BATCH_SIZE', 100)
+        self.deletes = None
+        # Stage timings, reset by every bulk run and fed to FORM_1098T_METRICS_HOOK
+        self.timings = StageTimings(get_metrics_hook())
         
         # Initialize generator with template for this year
         template_path = get_template_path(tax_year)
         self.generator = Form1098TGenerator(template_path)
     
-    def publish_all_students(self, student_ids=None) -> Dict[str, any]:
+    def publish_all_students(
+        self,
+        student_ids=None,
+        resume_run: Optional[Form1098TPublishRun] = None,
+        force: bool = False
+    ) -> Dict[str, any]:
         """
         Publish 1098-T forms for all eligible students.
         
+        Progress is checkpointed in a Form1098TPublishRun after every chunk.
+        Pass an unfinished run as resume_run to continue it after the last
+        committed chunk; its original student selection is reused. Without
+        student_ids, the students with transactions in the year are stored
+        on the run when it starts.
+        
+        Students whose published form was built from the same inputs (see
+        Form1098TGenerator.fingerprint) are left alone unless force is set.
+        
         Returns:
-            Dictionary with success/error counts and details
+            Dictionary with success/error counts and details, the run's ID,
+            elapsed_seconds and per-stage timings under 'stages' (summary,
+            generate, upload, delete and db_write; see StageTimings.summary)
         """
-        if not student_ids:
-            # Get all students with transactions in the tax year
-            start_date = datetime(self.tax_year, 1, 1)
-            end_date = datetime(self.tax_year, 12, 31, 23, 59, 59)
-            
-            student_ids = StudentTransaction.objects.filter(
-                created_on__gte=start_date,
-                created_on__lte=end_date
-            ).values_list('student__id', flat=True).distinct()
+        started = time.perf_counter()
+        self.timings = StageTimings(self.timings.hook)
         
+        if resume_run is not None:
+            run = resume_run
+        else:
+            run = Form1098TPublishRun.objects.create(
+                tax_year=self.tax_year,
+                student_ids=[str(student_id) for student_id in student_ids] if student_ids else None,
+                started_by=self.published_by
+            )
+        
+        # Resuming walks the stored IDs, so students who get transactions
+        # after the run started never slip in below its cursor
+        if run.student_ids is None:
+            run.student_ids = [
+                str(student_id) for student_id in self._transaction_student_ids() if student_id is not None
+            ]
+            run.save(update_fields=['student_ids', 'updated_at'])
+        student_ids = run.student_ids
+        
+        # Chunks cover consecutive IDs, so the run's cursor marks where to resume
         students = Student.objects.filter(
             id__in=student_ids
-        ).select_related('user', 'highschool')
+        ).select_related('user', 'highschool').order_by('id')
+        if not run.student_count:
+            run.student_count = students.count()
+            run.save(update_fields=['student_count', 'updated_at'])
+        if run.last_student_id:
+            students = students.filter(id__gt=run.last_student_id)
         
         results = {
+            'success_count': run.success_count,
+            'error_count': run.error_count,
+            'skipped_count': run.skipped_count,
+            'unchanged_count': run.unchanged_count,
+            'errors': list(run.errors)
+        }
+        
+        self.run = run
+        self.deletes = self.storage.delete_queue(self.delete_batch_size, self.timings)
+        uploader = None
+        if self.upload_workers > 1:
+            uploader = UploadPool(self.storage, self.upload_workers, timings=self.timings)
+        try:
+            items = self._iter_items(students, force=force)
+            if self.workers > 1:
+                items = self._generate_in_pool(items)
+            else:
+                items = self._generate_serial(items)
+            if uploader is not None:
+                items = self._upload_async(items, uploader)
+            
+            for chunk in self._chunks(items):
+                self._publish_chunk(chunk, results)
+        except BaseException as e:
+            if uploader is not None:
+                uploader.shutdown(cancel=True)
+            run.finish(Form1098TPublishRun.STATUS_FAILED, failure_reason=str(e) or type(e).__name__)
+            raise
+        finally:
+            if uploader is not None:
+                uploader.shutdown()
+            # Files replaced by committed chunks go even if the run failed
+            self.deletes.flush()
+            self.deletes = None
+            self.run = None
+        
+        run.finish(Form1098TPublishRun.STATUS_COMPLETED)
+        results['run_id'] = run.id
+        results['elapsed_seconds'] = round(time.perf_counter() - started, 4)
+        results['stages'] = self.timings.summary()
+        return results
+    
+    def plan(self, student_ids=None) -> Dict[str, any]:
+        """
+        Report what publish_all_students would do, without generating PDFs
+        or touching storage.
+        
+        Works from the bulk summary query and aggregates over Form1098T, one
+        chunk of students at a time. Like a real run, students whose
+        published form has the fingerprint their form would be built with
+        now are counted as unchanged rather than replaced.
+        
+        Returns:
+            Dictionary with student, publish, skip, unchanged, new and
+            replace counts, the Box 1 (payments) and Box 5 (scholarships)
+            totals of every qualifying student, and the count of published
+            forms whose amounts would change
+        """
+        if not student_ids:
+            student_ids = self._transaction_student_ids()
+        
+        plan = {
+            'student_count': 0,
+            'publish_count': 0,
+            'skipped_count': 0,
+            'unchanged_count': 0,
+            'new_count': 0,
+            'replace_count': 0,
+            'amounts_changed_count': 0,
+            'box1_total': Decimal('0.00'),
+            'box5_total': Decimal('0.00')
+        }
+        
+        for chunk in self._chunks(student_ids):
+            summaries = self._get_summaries(chunk)
+            qualifying = {}
+            for student_id in chunk:
+                summary = summaries.get(student_id, self._empty_summary())
+                if self._has_qualifying_amounts(summary):
+                    qualifying[student_id] = summary
+            
+            published = {
+                student_id: (fingerprint, payments, scholarships)
+                for student_id, fingerprint, payments, scholarships in Form1098T.objects.filter(
+                    student_id__in=list(qualifying),
+                    tax_year=self.tax_year,
+                    is_published=True
+                ).values_list('student_id', 'fingerprint', 'payments_received', 'scholarships_grants')
+            }
+            students = Student.objects.filter(id__in=list(published)).select_related('user')
+            
+            replace_count = unchanged_count = 0
+            for student in students:
+                summary = qualifying[student.id]
+                fingerprint, payments, scholarships = published[student.id]
+                if fingerprint == self.generator.fingerprint(self._build_form_record(student, summary)):
+                    unchanged_count += 1
+                    continue
+                replace_count += 1
+                if (payments, scholarships) != (summary['payments'], summary['scholarships']):
+                    plan['amounts_changed_count'] += 1
+            
+            plan['student_count'] += len(chunk)
+            plan['publish_count'] += len(qualifying) - unchanged_count
+            plan['skipped_count'] += len(chunk) - len(qualifying)
+            plan['unchanged_count'] += unchanged_count
+            plan['replace_count'] += replace_count
+            plan['new_count'] += len(qualifying) - len(published)
+            plan['box1_total'] += sum((summary['payments'] for summary in qualifying.values()), Decimal('0.00'))
+            plan['box5_total'] += sum((summary['scholarships'] for summary in qualifying.values()), Decimal('0.00'))
+        
+        return plan
+    
+    def _transaction_student_ids(self):
+        """IDs of all students with transactions in the tax year."""
+        start_date = datetime(self.tax_year, 1, 1)
+        end_date = datetime(self.tax_year, 12, 31, 23, 59, 59)
+        
+        return StudentTransaction.objects.filter(
+            created_on__gte=start_date,
+            created_on__lte=end_date
+        ).values_list('student__id', flat=True).distinct()
+    
+    def _iter_items(self, students, force: bool = False):
+        """
+        Yield a _PublishItem for every student in order, fetching summaries
+        and existing fingerprints one chunk of students at a time.
+        
+        Students without qualifying amounts are marked 'skipped', and those
+        whose published form has the same fingerprint 'unchanged' unless
+        force is set. If a chunk's queries fail, every student in it
+        carries the error.
+        """
+        for chunk in self._chunks(students.iterator(chunk_size=self.chunk_size)):
+            student_ids = [student.id for student in chunk]
+            try:
+                # Timed as the summary stage together with the fingerprint lookup
+                with self.timings.time('summary', len(chunk)):
+                    summaries = self._get_summaries(student_ids)
+                    published = {} if force else dict(
+                        Form1098T.objects.filter(
+                            student_id__in=student_ids,
+                            tax_year=self.tax_year,
+                            is_published=True
+                        ).values_list('student_id', 'fingerprint')
+                    )
+            except Exception as e:
+                for student in chunk:
+                    yield _PublishItem(student, None, error=e)
+                continue
+            
+            for student in chunk:
+                item = _PublishItem(student, summaries.get(student.id, self._empty_summary()))
+                if not self._has_qualifying_amounts(item.summary):
+                    item.outcome = 'skipped'
+                else:
+                    try:
+                        item.record = self._build_form_record(student, item.summary)
+                        item.fingerprint = self.generator.fingerprint(item.record)
+                        if published.get(student.id) == item.fingerprint:
+                            item.outcome = 'unchanged'
+                    except Exception as e:
+                        item.error = e
+                yield item
+    
+    def _generate_serial(self, items):
+        """Fill the PDF of every item that needs one, in this process."""
+        for item in items:
+            if item.needs_pdf:
+                try:
+                    with self.timings.time('generate'):
+                        item.pdf_bytes = self.generator.generate_record(item.record)
+                except Exception as e:
+                    item.error = e
+            yield item
+    
+    def _generate_in_pool(self, items):
+        """
+        Like _generate_serial, with PDF generation spread across worker
+        processes. Items come back in student order. The generate stage
+        times how long the pipeline waits for each PDF, not worker CPU time.
+        """
+        pending, for_records = itertools.tee(items)
+        records = (item.record for item in for_records if item.needs_pdf)
+        generated = generate_in_pool(self.generator, records, self.workers)
+        
+        for item in pending:
+            if item.needs_pdf:
+                with self.timings.time('generate'):
+                    item.pdf_bytes, error = next(generated)
+                if error:
+                    item.error = RuntimeError(error)
+            yield item
+    
+    def _upload_async(self, items, uploader: UploadPool):
+        """
+        Start uploading each generated PDF as soon as it is ready, so
+        generation carries on while earlier forms upload. _publish_chunk
+        waits for the uploads before recording the chunk.
+        """
+        for item in items:
+            if item.needs_pdf:
+                item.upload = uploader.submit(item.pdf_bytes, item.student.id, self.tax_year)
+                # The upload holds the PDF until it is stored
+                item.pdf_bytes = None
+            yield item
+    
+    def _chunks(self, iterable):
+        iterator = iter(iterable)
+        while True:
+            chunk = list(itertools.islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+    
+    def _publish_chunk(self, chunk, results: Dict[str, any]):
+        """
+        Upload a chunk of generated forms, then record them in one transaction
+        together with the run checkpoint.
+        
+        No storage calls happen inside the transaction, so its row locks are
+        held only for the database writes. Old files of replaced forms are
+        queued for deletion once the new rows are committed. If the bulk
+        write fails, the chunk's forms are written one by one (see
+        _write_rows), so only the students whose rows fail are recorded as
+        errors. If the transaction fails as a whole, the new uploads are
+        removed and, during a run, the run stops with the checkpoint before
+        the chunk, so resuming retries it and no later chunk moves the
+        checkpoint past it. Outside a run every uploaded student is
+        recorded as an error.
+        """
+        started = time.monotonic()
+        chunk_results = self._new_results()
+        
+        uploaded = []
+        for item in chunk:
+            if item.outcome:
+                chunk_results[f'{item.outcome}_count'] += 1
+                continue
+            try:
+                if item.error:
+                    raise item.error
+                if item.upload is not None:
+                    item.file_path, item.file_size = item.upload.result()
+                else:
+                    with self.timings.time('upload'):
+                        item.file_path, item.file_size = self.storage.save_form(
+                            item.pdf_bytes,
+                            item.student.id,
+                            self.tax_year
+                        )
+                uploaded.append(item)
+            except Exception as e:
+                self._record_error(chunk_results, item.student, e)
+        
+        error_count, errors = chunk_results['error_count'], list(chunk_results['errors'])
+        failed = []
+        try:
+            with self.timings.time('db_write', len(uploaded)), transaction.atomic():
+                written, failed = self._write_rows(uploaded)
+                for item, error in failed:
+                    self._record_error(chunk_results, item.student, error)
+                chunk_results['success_count'] = len(written)
+                if self.run is not None:
+                    self.run.record_chunk(chunk[-1].student.id, chunk_results, time.monotonic() - started)
+        except Exception as e:
+            chunk_results.update(success_count=0, error_count=error_count, errors=errors)
+            failed = []
+            self._delete_files([item.file_path for item in uploaded])
+            if self.run is not None:
+                # record_chunk's changes were rolled back in the database only
+                self.run.refresh_from_db()
+                raise
+            for item in uploaded:
+                self._record_error(chunk_results, item.student, e)
+        
+        # Uploads whose rows were rolled back are not referenced by any form
+        self._delete_files([item.file_path for item, _ in failed])
+        
+        for key, value in chunk_results.items():
+            results[key] += value
+    
+    @staticmethod
+    def _new_results() -> Dict[str, any]:
+        return {
             'success_count': 0,
             'error_count': 0,
             'skipped_count': 0,
+            'unchanged_count': 0,
             'errors': []
         }
+    
+    def _write_rows(self, uploaded):
+        """
+        Write a chunk's forms in a savepoint with one bulk statement. If
+        that fails, write each form in its own savepoint instead, so one bad
+        row doesn't fail the students around it.
+        
+        Must be called inside a transaction.
         
-        for student in students:
+        Returns:
+            (written items, [(failed item, exception), ...])
+        """
+        if not uploaded:
+            return [], []
+        try:
+            with transaction.atomic():
+                self._queue_deletes(self._write_chunk(uploaded))
+            return uploaded, []
+        except Exception as e:
+            if len(uploaded) == 1:
+                return [], [(uploaded[0], e)]
+        
+        written, failed = [], []
+        for item in uploaded:
             try:
-                result = self.publish_student_form(student)
-                if result == 'published':
-                    results['success_count'] += 1
-                elif result == 'skipped':
-                    results['skipped_count'] += 1
+                with transaction.atomic():
+                    self._queue_deletes(self._write_chunk([item]))
+                written.append(item)
             except Exception as e:
-                results['error_count'] += 1
-                results['errors'].append({
-                    'student_id': student.id,
-                    'student_name': f"{student.user.first_name} {student.user.last_name}",
-                    'error': str(e)
-                })
+                failed.append((item, e))
+        return written, failed
+    
+    def _write_chunk(self, uploaded) -> list:
+        """
+        Unpublish existing forms and insert the new ones for a chunk.
         
-        return results
+        The old rows are unpublished before the new rows are inserted, so
+        unique_published_form_per_student_year holds throughout.
+        
+        Must be called inside a transaction.
+        
+        Returns:
+            File paths of the forms that were replaced
+        """
+        existing = list(
+            Form1098T.objects.select_for_update().filter(
+                student__in=[item.student for item in uploaded],
+                tax_year=self.tax_year,
+                is_published=True
+            ).values_list('id', 'file_path')
+        )
+        if existing:
+            Form1098T.objects.filter(
+                id__in=[form_id for form_id, _ in existing]
+            ).update(is_published=False, updated_at=timezone.now())
+        
+        Form1098T.objects.bulk_create([
+            self._build_form(item.student, item.summary, item.file_path, item.file_size, item.fingerprint)
+            for item in uploaded
+        ])
+        
+        return [file_path for _, file_path in existing]
+    
+    def _queue_deletes(self, file_paths):
+        """
+        Delete replaced files after the current transaction commits.
+        
+        During a bulk run the paths go to the run's DeleteQueue and are
+        deleted in batches; otherwise they are deleted straight after
+        commit. Nothing is deleted if the transaction rolls back.
+        """
+        if not file_paths:
+            return
+        
+        def on_commit():
+            if self.deletes is None:
+                self._delete_files(file_paths)
+            else:
+                self.deletes.add(file_paths)
+        
+        transaction.on_commit(on_commit)
+    
+    def _delete_files(self, file_paths):
+        """Delete files now, in one storage batch; failures are only printed."""
+        if file_paths:
+            with self.timings.time('delete', len(file_paths)):
+                self.storage.delete_many(file_paths)
+    
+    @staticmethod
+    def _record_error(results: Dict[str, any], student: Student, error: Exception):
+        results['error_count'] += 1
+        results['errors'].append({
+            'student_id': student.id,
+            'student_name': f"{student.user.first_name} {student.user.last_name}",
+            'error': str(error)
+        })
+    
+    def unpublish_unqualified(self, student_ids) -> int:
+        """
+        Unpublish the forms of students among student_ids who no longer
+        have qualifying amounts in the tax year, e.g. after their payments
+        were reversed. The publish methods skip such students, so their old
+        forms would otherwise stay live. Files are deleted after commit.
+        
+        Returns:
+            Number of forms unpublished
+        """
+        unpublished = 0
+        for chunk in self._chunks(student_ids):
+            summaries = self._get_summaries(chunk)
+            stale = [
+                student_id for student_id in chunk
+                if not self._has_qualifying_amounts(summaries.get(student_id, self._empty_summary()))
+            ]
+            if not stale:
+                continue
+            
+            with transaction.atomic():
+                forms = list(
+                    Form1098T.objects.select_for_update().filter(
+                        student_id__in=stale,
+                        tax_year=self.tax_year,
+                        is_published=True
+                    ).values_list('id', 'file_path')
+                )
+                Form1098T.objects.filter(
+                    id__in=[form_id for form_id, _ in forms]
+                ).update(is_published=False, updated_at=timezone.now())
+                self._queue_deletes([file_path for _, file_path in forms])
+            unpublished += len(forms)
+        return unpublished
     
     def publish_student_form(self, student: Student, regenerate: bool = True) -> str:
         """
@@ -80,87 +540,133 @@ class Form1098TPublisher:
         Returns:
             'published', 'skipped', or 'error'
         """
-        # Get financial summary
+        summary = self._get_summary(student)
+
+        # Skip if no qualifying transactions
+        if not self._has_qualifying_amounts(summary):
+            return 'skipped'
+        
+        return self._publish_with_summary(student, summary, regenerate=regenerate)
+    
+    def _get_summary(self, student: Student) -> Dict:
+        """Get the student's financial summary for the tax year."""
+        return self._get_summaries([student.id]).get(student.id, self._empty_summary())
+    
+    def _get_summaries(self, student_ids) -> Dict:
+        """Get financial summaries for the tax year, keyed by student ID, in one query."""
         start_date = datetime(self.tax_year, 1, 1)
         end_date = datetime(self.tax_year, 12, 31, 23, 59, 59)
         
-        from decimal import Decimal
         from ..settings.f1098 import f1098
         configs = f1098.from_db()
 
-        summary = StudentTransaction.objects.get_bulk_1098t_summary(
-            student_ids=[student.id],
+        return StudentTransaction.objects.get_bulk_1098t_summary(
+            student_ids=student_ids,
             start_date=start_date,
             end_date=end_date,
             configs=configs
-        ).get(student.id, {'charges': Decimal('0.0'), 'refunds': Decimal('0.0'), 'payments': Decimal('0.0'), 'scholarships': Decimal('0.0')})        
+        )
+    
+    @staticmethod
+    def _empty_summary() -> Dict:
+        return {'charges': Decimal('0.0'), 'refunds': Decimal('0.0'), 'payments': Decimal('0.0'), 'scholarships': Decimal('0.0')}
 
-        # Skip if no qualifying transactions
-        if summary['payments'] <= 0 and summary['scholarships'] <= 0:
+    @staticmethod
+    def _has_qualifying_amounts(summary: Dict) -> bool:
+        return summary['payments'] > 0 or summary['scholarships'] > 0
+    
+    def _build_form_record(self, student: Student, summary: Dict) -> tuple:
+        """Build the (student_data, amounts, optional_amounts) generator record."""
+        student_data = self._prepare_student_data(student)
+        amounts = {
+            'payments': summary['payments'],
+            'scholarships': summary['scholarships']
+        }
+        optional_amounts = {
+            'adjustments': summary.get('refunds', Decimal('0.0')),
+            'scholarship_adjustments': Decimal('0.0'),
+            'insurance_refund': Decimal('0.0')
+        }
+        return student_data, amounts, optional_amounts
+    
+    def _publish_with_summary(
+        self,
+        student: Student,
+        summary: Dict,
+        regenerate: bool = True,
+        pdf_bytes: Optional[io.BytesIO] = None
+    ) -> str:
+        """
+        Store and record a student's form from an already computed summary.
+        
+        The new PDF is uploaded before a short transaction swaps the
+        published row; the replaced form's file is deleted after commit.
+        
+        Args:
+            pdf_bytes: Pre-generated PDF; generated here when omitted
+        """
+        if not regenerate and Form1098T.objects.filter(
+            student=student,
+            tax_year=self.tax_year,
+            is_published=True
+        ).exists():
             return 'skipped'
         
-        with transaction.atomic():
-            # Check for existing published form
-            existing_form = Form1098T.objects.filter(
-                student=student,
-                tax_year=self.tax_year,
-                is_published=True
-            ).first()
-            
-            if existing_form:
-                if not regenerate:
-                    return 'skipped'
-                # Delete old file and unpublish
-                self.storage.delete_form(existing_form.file_path)
-                existing_form.is_published = False
-                existing_form.save()
-            
-            # Generate PDF
-            student_data = self._prepare_student_data(student)
-            amounts = {
-                'payments': summary['payments'],
-                'scholarships': summary['scholarships']
-            }
-            optional_amounts = {
-                'adjustments': summary.get('refunds', Decimal('0.0')),
-                'scholarship_adjustments': Decimal('0.0'),
-                'insurance_refund': Decimal('0.0')
-            }
-            
-            pdf_bytes = self.generator.generate_filled_form(
-                student_data=student_data,
-                amounts=amounts,
-                optional_amounts=optional_amounts
-            )
-            
-            # Save to S3
-            file_path, file_size = self.storage.save_form(
-                pdf_bytes.getvalue(),
+        item = _PublishItem(student, summary)
+        item.record = self._build_form_record(student, summary)
+        item.fingerprint = self.generator.fingerprint(item.record)
+        
+        # Generate PDF
+        if pdf_bytes is None:
+            pdf_bytes = self.generator.generate_record(item.record)
+        
+        # Save to S3, outside the transaction
+        with self.timings.time('upload'):
+            item.file_path, item.file_size = self.storage.save_form(
+                pdf_bytes,
                 student.id,
                 self.tax_year
             )
-            
-            # Create database record
-            form = Form1098T.objects.create(
-                student=student,
-                tax_year=self.tax_year,
-                payments_received=summary['payments'],
-                scholarships_grants=summary['scholarships'],
-                adjustments=summary.get('refunds', Decimal('0.0')),
-                scholarship_adjustments=Decimal('0.0'),
-                student_name=f"{student.user.first_name} {student.user.last_name}",
-                student_tin=student.user.ssn or '',
-                student_address=self._format_student_address(student),
-                file_path=file_path,
-                file_size=file_size,
-                is_published=True,
-                published_at=timezone.now(),
-                published_by=self.published_by
-            )
-            
-            return 'published'
+        
+        # Swap the published row
+        try:
+            with self.timings.time('db_write'), transaction.atomic():
+                self._queue_deletes(self._write_chunk([item]))
+        except Exception:
+            self._delete_files([item.file_path])
+            raise
+        
+        return 'published'
+    
+    def _build_form(
+        self,
+        student: Student,
+        summary: Dict,
+        file_path: str,
+        file_size: int,
+        fingerprint: str = ''
+    ) -> Form1098T:
+        """Build an unsaved published Form1098T row."""
+        return Form1098T(
+            student=student,
+            tax_year=self.tax_year,
+            payments_received=summary['payments'],
+            scholarships_grants=summary['scholarships'],
+            adjustments=summary.get('refunds', Decimal('0.0')),
+            scholarship_adjustments=Decimal('0.0'),
+            student_name=f"{student.user.first_name} {student.user.last_name}",
+            student_tin=student.user.ssn or '',
+            student_address=self._format_student_address(student),
+            file_path=file_path,
+            file_size=file_size,
+            fingerprint=fingerprint,
+            is_published=True,
+            published_at=timezone.now(),
+            published_by=self.published_by
+        )
     
-    def _prepare_student_data(self, student: Student) -> Dict:
+    @staticmethod
+    def _prepare_student_data(student: Student) -> Dict:
         """Prepare student data for PDF generation."""
         user_id = student.user.psid
         if student.user.psid in [None, '', '-']:
@@ -180,4 +686,26 @@ class Form1098TPublisher:
             student.user.city,
             f"{student.user.state} {student.user.postal_code}"
         ]
-        return ", ".join(filter(None, parts))
\ No newline at end of file
+        return ", ".join(filter(None, parts))
+
+
+class _PublishItem:
+    """One student's progress through the bulk publish pipeline."""
+    
+    def __init__(self, student: Student, summary: Optional[Dict], error: Optional[Exception] = None):
+        self.student = student
+        self.summary = summary
+        self.error = error
+        # 'skipped' or 'unchanged' when no form is published for the student
+        self.outcome = None
+        self.record = None
+        self.fingerprint = ''
+        self.pdf_bytes = None
+        # Future of the upload started by _upload_async
+        self.upload = None
+        self.file_path = None
+        self.file_size = 0
+    
+    @property
+    def needs_pdf(self) -> bool:
+        return self.outcome is None and self.error is None
@@ -1,50 +1,448 @@
 # django_1098t/services/storage.py
 
-from django.core.files.base import ContentFile
-from cis.backends.storage_backend import PrivateMediaStorage
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from typing import Iterable, Iterator, List, Optional, Set
 from ..constants import STORAGE_PATH_PREFIX
+from ..models import Form1098T
+from .backends import is_s3_storage, s3_delete_many, s3_open_stream
+from .cache import get_form_cache
 import datetime
+import hashlib
+import uuid
+
+
+DEFAULT_STORAGE_CLASS = 'cis.backends.storage_backend.PrivateMediaStorage'
+
+# Content-addressed forms are stored as <prefix>/<first two hex digits>/<sha256>.pdf
+CONTENT_ADDRESSED_PREFIX = f'{STORAGE_PATH_PREFIX}sha256/'
+
+# Bytes per chunk when streaming a form out of storage
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+
+# How long sweep_content() leaves shared objects alone after they were
+# written or a form referring to them changed
+DEFAULT_SWEEP_GRACE_SECONDS = 24 * 60 * 60
+
+
+def get_storage_class():
+    """
+    Resolve DJANGO_1098T_STORAGE_CLASS, a dotted path to a Django Storage
+    class. Besides the default S3-backed PrivateMediaStorage, the app ships
+    services.backends.LocalFileStorage and services.backends.MemoryStorage.
+    """
+    return import_string(getattr(settings, 'DJANGO_1098T_STORAGE_CLASS', DEFAULT_STORAGE_CLASS))
 
 
 class Form1098TStorage:
-    """Handles S3 storage operations for 1098-T forms."""
+    """
+    Handles storage operations for 1098-T forms.
+    
+    Backends may implement delete_many(names) -> failed names and
+    exists_many(names) -> existing names to serve the batch operations
+    in fewer calls; otherwise they fall back to one call per file.
+    
+    In content-addressed mode (FORM_1098T_CONTENT_ADDRESSED_STORAGE) a form
+    is stored under the SHA-256 of its bytes, and identical forms share one
+    object. Shared objects are never deleted by delete_form or delete_many;
+    sweep_content removes the ones no form needs any more.
     
-    def __init__(self):
-        self.storage = PrivateMediaStorage()
+    Reads go through the FORM_1098T_READ_CACHE cache when one is configured;
+    paths are dropped from it whenever they are saved or deleted.
+    """
     
-    def save_form(self, pdf_bytes: bytes, student_id: int, tax_year: int) -> tuple:
+    def __init__(self, storage=None, content_addressed: Optional[bool] = None):
+        self.storage = storage if storage is not None else get_storage_class()()
+        if content_addressed is None:
+            content_addressed = getattr(settings, 'FORM_1098T_CONTENT_ADDRESSED_STORAGE', False)
+        self.content_addressed = content_addressed
+        self.cache = get_form_cache()
+    
+    def save_form(self, pdf_bytes, student_id: int, tax_year: int) -> tuple:
         """
-        Save a PDF form to S3 storage.
+        Save a PDF form to storage.
         
         Args:
-            pdf_bytes: PDF file content as bytes
+            pdf_bytes: PDF file content as bytes, or a binary file-like object
+                (e.g. the generator's BytesIO), which is uploaded without
+                copying its contents
             student_id: Student ID
             tax_year: Tax year
             
         Returns:
             Tuple of (file_path, file_size)
         """
+        content = self._as_file(pdf_bytes)
+        file_size = content.size
+        
+        if self.content_addressed:
+            file_path = self._content_path(pdf_bytes)
+            # Reuse the object only while a published form holds it, which
+            # keeps sweep_content() away from it until this form's row has
+            # committed. Otherwise write it afresh, restarting its age.
+            if not self._referenced_paths([file_path]):
+                self._write_content(file_path, content)
+        else:
+            file_path = self.storage.save(self._form_path(student_id, tax_year), content)
+        
+        self._invalidate([file_path])
+        return file_path, file_size
+    
+    def save_many(self, forms: Iterable[tuple]) -> List[tuple]:
+        """
+        Save several forms.
+        
+        Args:
+            forms: (pdf_bytes, student_id, tax_year) tuples
+            
+        Returns:
+            (file_path, file_size) tuples, in the order given
+        """
+        return [self.save_form(pdf_bytes, student_id, tax_year) for pdf_bytes, student_id, tax_year in forms]
+    
+    @staticmethod
+    def _form_path(student_id: int, tax_year: int) -> str:
+        # The random suffix keeps concurrent publishers from writing the
+        # same path, which one of them would later delete as replaced
         timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        file_path = (
+        return (
             f"{STORAGE_PATH_PREFIX}{tax_year}/"
-            f"student_{student_id}_1098t_{tax_year}_{timestamp}.pdf"
+            f"student_{student_id}_1098t_{tax_year}_{timestamp}_{uuid.uuid4().hex[:8]}.pdf"
         )
+    
+    @staticmethod
+    def _content_path(pdf_bytes) -> str:
+        """Content-addressed path of a PDF given as bytes or a file-like object."""
+        digest = hashlib.sha256()
+        if isinstance(pdf_bytes, (bytes, bytearray)):
+            digest.update(pdf_bytes)
+        elif hasattr(pdf_bytes, 'getbuffer'):
+            digest.update(pdf_bytes.getbuffer())
+        else:
+            pdf_bytes.seek(0)
+            for block in iter(lambda: pdf_bytes.read(64 * 1024), b''):
+                digest.update(block)
+            pdf_bytes.seek(0)
+        hexdigest = digest.hexdigest()
+        return f"{CONTENT_ADDRESSED_PREFIX}{hexdigest[:2]}/{hexdigest}.pdf"
+    
+    def _write_content(self, file_path: str, content: File):
+        """
+        Write a content-addressed object at exactly file_path.
         
-        self.storage.save(file_path, ContentFile(pdf_bytes))
-        file_size = len(pdf_bytes)
+        Storage.save() renames rather than overwrites an existing name on
+        most backends, so the old copy is deleted first. If a concurrent
+        publisher writes the same bytes in between, our renamed copy is
+        dropped in favour of theirs.
+        """
+        try:
+            self.storage.delete(file_path)
+        except FileNotFoundError:
+            pass
+        saved_path = self.storage.save(file_path, content)
+        if saved_path != file_path:
+            self.storage.delete(saved_path)
+    
+    @staticmethod
+    def _as_file(pdf_bytes) -> File:
+        """Wrap bytes or a file-like object for Storage.save without a copy."""
+        if isinstance(pdf_bytes, (bytes, bytearray)):
+            return ContentFile(pdf_bytes)
         
-        return file_path, file_size
+        content = File(pdf_bytes)
+        if hasattr(pdf_bytes, 'getbuffer'):
+            # BytesIO: size without getvalue()'s copy
+            content.size = pdf_bytes.getbuffer().nbytes
+        pdf_bytes.seek(0)
+        return content
     
     def delete_form(self, file_path: str):
-        """Delete a form from S3 storage."""
-        if self.storage.exists(file_path):
+        """
+        Delete a form from storage; a missing file counts as deleted.
+        
+        Content-addressed files are kept for sweep_content.
+        """
+        if file_path.startswith(CONTENT_ADDRESSED_PREFIX):
+            return
+        self._invalidate([file_path])
+        try:
             self.storage.delete(file_path)
+        except FileNotFoundError:
+            pass
+    
+    @staticmethod
+    def _referenced_paths(file_paths: List[str]) -> Set[str]:
+        """
+        The content-addressed paths among file_paths that a published form
+        still points at.
+        """
+        shared = [file_path for file_path in file_paths if file_path.startswith(CONTENT_ADDRESSED_PREFIX)]
+        if not shared:
+            return set()
+        return set(
+            Form1098T.objects.filter(
+                file_path__in=shared,
+                is_published=True
+            ).values_list('file_path', flat=True)
+        )
+    
+    def delete_many(self, file_paths: Iterable[str]) -> List[str]:
+        """
+        Delete several forms without checking that they exist first.
+        
+        Uses the backend's own delete_many, S3 multi-object deletes for
+        django-storages S3 backends, or else one delete per file. Missing
+        files count as deleted, and content-addressed files are kept for
+        sweep_content, whatever the current mode: a concurrent publisher may
+        be about to commit a form that points at one. Failures are printed
+        rather than raised.
+        
+        Returns:
+            File paths that could not be deleted
+        """
+        file_paths = [
+            file_path for file_path in file_paths
+            if not file_path.startswith(CONTENT_ADDRESSED_PREFIX)
+        ]
+        if not file_paths:
+            return []
+        return self._delete_objects(file_paths)
+    
+    def _delete_objects(self, file_paths: List[str]) -> List[str]:
+        """Delete files with the backend's cheapest batch call, see delete_many."""
+        try:
+            self._invalidate(file_paths)
+            
+            if hasattr(self.storage, 'delete_many'):
+                failed = list(self.storage.delete_many(file_paths))
+            elif is_s3_storage(self.storage):
+                failed = s3_delete_many(self.storage, file_paths)
+            else:
+                failed = []
+                for file_path in file_paths:
+                    try:
+                        self.storage.delete(file_path)
+                    except FileNotFoundError:
+                        pass
+                    except Exception as e:
+                        print(f"Warning: Could not delete {file_path}: {e}")
+                        failed.append(file_path)
+                return failed
+        except Exception as e:
+            print(f"Warning: Could not delete {len(file_paths)} 1098-T file(s): {e}")
+            return file_paths
+        
+        for file_path in failed:
+            print(f"Warning: Could not delete {file_path}")
+        return failed
+    
+    def sweep_content(self, grace_seconds: Optional[int] = None) -> List[str]:
+        """
+        Delete the content-addressed objects no form needs any more.
+        
+        An object is deleted when no published form points at it, no form
+        pointing at it changed within grace_seconds
+        (FORM_1098T_CONTENT_SWEEP_GRACE_SECONDS, default a day) and the
+        object is older than that. Publishers reuse an object only while a
+        published form points at it and write it afresh otherwise, so a form
+        that has not committed yet never loses its file. Objects whose age
+        the backend can't report are kept.
+        
+        Returns:
+            File paths deleted
+        """
+        if grace_seconds is None:
+            grace_seconds = getattr(settings, 'FORM_1098T_CONTENT_SWEEP_GRACE_SECONDS', DEFAULT_SWEEP_GRACE_SECONDS)
+        cutoff = timezone.now() - datetime.timedelta(seconds=grace_seconds)
+        root = CONTENT_ADDRESSED_PREFIX.rstrip('/')
+        
+        try:
+            directories, _ = self.storage.listdir(root)
+        except (NotImplementedError, FileNotFoundError):
+            return []
+        
+        deleted = []
+        for directory in directories:
+            _, names = self.storage.listdir(f"{root}/{directory}")
+            file_paths = [f"{root}/{directory}/{name}" for name in names]
+            in_use = set(
+                Form1098T.objects.filter(file_path__in=file_paths).filter(
+                    Q(is_published=True) | Q(updated_at__gte=cutoff)
+                ).values_list('file_path', flat=True)
+            )
+            
+            unused = []
+            for file_path in file_paths:
+                if file_path in in_use:
+                    continue
+                try:
+                    if self.storage.get_modified_time(file_path) >= cutoff:
+                        continue
+                except (NotImplementedError, FileNotFoundError):
+                    continue
+                unused.append(file_path)
+            
+            if unused:
+                failed = set(self._delete_objects(unused))
+                deleted.extend(file_path for file_path in unused if file_path not in failed)
+        return deleted
+    
+    def delete_queue(self, batch_size: Optional[int] = None, timings=None) -> 'DeleteQueue':
+        """Return a DeleteQueue that deletes paths from this storage in batches."""
+        return DeleteQueue(self, batch_size=batch_size, timings=timings)
     
     def get_file_content(self, file_path: str) -> bytes:
-        """Retrieve file content from S3."""
+        """Retrieve file content from storage, or from the read cache."""
+        if self.cache is not None:
+            content = self.cache.get(file_path)
+            if content is not None:
+                return content
+        
         with self.storage.open(file_path, 'rb') as f:
-            return f.read()
+            content = f.read()
+        
+        if self.cache is not None:
+            self.cache.set(file_path, content)
+        return content
+    
+    def _invalidate(self, file_paths: Iterable[str]):
+        if self.cache is not None:
+            for file_path in file_paths:
+                self.cache.delete(file_path)
+    
+    def open_form(self, file_path: str):
+        """
+        Open a form for reading as a stream.
+        
+        S3 backends stream straight from the GET response; other backends
+        return storage.open(). The caller must close the stream.
+        """
+        if is_s3_storage(self.storage):
+            return s3_open_stream(self.storage, file_path)
+        return self.storage.open(file_path, 'rb')
+    
+    def signed_url(self, file_path: str, filename: Optional[str] = None, expire: Optional[int] = None) -> Optional[str]:
+        """
+        A short-lived presigned URL for a form, or None if the backend can't
+        sign URLs (only django-storages S3 backends can).
+        
+        Args:
+            filename: Download filename the URL's response should carry
+            expire: Seconds the URL stays valid (default: FORM_1098T_PRESIGNED_URL_EXPIRY or 60)
+        """
+        if not is_s3_storage(self.storage) or not getattr(self.storage, 'querystring_auth', True):
+            return None
+        if expire is None:
+            expire = getattr(settings, 'FORM_1098T_PRESIGNED_URL_EXPIRY', 60)
+        parameters = {'ResponseContentType': 'application/pdf'}
+        if filename:
+            parameters['ResponseContentDisposition'] = f'attachment; filename="{filename}"'
+        return self.storage.url(file_path, parameters=parameters, expire=expire)
+    
+    def local_path(self, file_path: str) -> Optional[str]:
+        """The form's path on the local filesystem, or None for remote backends."""
+        try:
+            return self.storage.path(file_path)
+        except NotImplementedError:
+            return None
+    
+    def iter_file_content(self, file_path: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Stream a form's content in chunks, e.g. into a StreamingHttpResponse
+        or a zip entry, without holding the whole file in memory.
+        
+        The file is opened straight away, so a missing file raises here
+        rather than on the first chunk. With a read cache, cached forms are
+        served from it, and forms small enough to cache are added once
+        streamed in full.
+        
+        Args:
+            chunk_size: Bytes per chunk (default: FORM_1098T_STREAM_CHUNK_SIZE or 64 KB)
+        """
+        if chunk_size is None:
+            chunk_size = getattr(settings, 'FORM_1098T_STREAM_CHUNK_SIZE', DEFAULT_STREAM_CHUNK_SIZE)
+        
+        if self.cache is not None:
+            content = self.cache.get(file_path)
+            if content is not None:
+                return (content[start:start + chunk_size] for start in range(0, len(content), chunk_size))
+        
+        return self._iter_chunks(self.open_form(file_path), chunk_size, file_path)
+    
+    def _iter_chunks(self, stream, chunk_size: int, file_path: str) -> Iterator[bytes]:
+        # Chunks are kept for the cache until the file outgrows an entry
+        kept = [] if self.cache is not None else None
+        kept_size = 0
+        try:
+            for chunk in iter(lambda: stream.read(chunk_size), b''):
+                if kept is not None:
+                    kept_size += len(chunk)
+                    if kept_size > self.cache.max_entry_bytes:
+                        kept = None
+                    else:
+                        kept.append(chunk)
+                yield chunk
+        finally:
+            stream.close()
+        
+        if kept is not None:
+            self.cache.set(file_path, b''.join(kept))
     
     def file_exists(self, file_path: str) -> bool:
-        """Check if a file exists in S3."""
-        return self.storage.exists(file_path)
\ No newline at end of file
+        """Check if a file exists in storage."""
+        return self.storage.exists(file_path)
+    
+    def exists_many(self, file_paths: Iterable[str]) -> Set[str]:
+        """Return the given file paths that exist in storage."""
+        file_paths = list(file_paths)
+        if hasattr(self.storage, 'exists_many'):
+            return set(self.storage.exists_many(file_paths))
+        return {file_path for file_path in file_paths if self.storage.exists(file_path)}
+
+
+class DeleteQueue:
+    """
+    Collects file paths and deletes them with Form1098TStorage.delete_many,
+    a batch at a time.
+    
+    A batch is deleted whenever batch_size paths are queued, and the rest
+    by flush() or on leaving a with block. Each batch is recorded as the
+    delete stage of timings, when given.
+    """
+    
+    def __init__(self, storage: Form1098TStorage, batch_size: Optional[int] = None, timings=None):
+        self.storage = storage
+        if batch_size is None:
+            batch_size = getattr(settings, 'FORM_1098T_DELETE_BATCH_SIZE', 100)
+        self.batch_size = max(int(batch_size), 1)
+        self.timings = timings
+        self.pending = []
+        self.failed = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+    
+    def add(self, file_paths: Iterable[str]):
+        self.pending.extend(file_paths)
+        while len(self.pending) >= self.batch_size:
+            batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            self._delete(batch)
+    
+    def flush(self):
+        """Delete every queued path."""
+        batch, self.pending = self.pending, []
+        if batch:
+            self._delete(batch)
+    
+    def _delete(self, batch: List[str]):
+        if self.timings is None:
+            self.failed.extend(self.storage.delete_many(batch))
+            return
+        with self.timings.time('delete', len(batch)):
+            self.failed.extend(self.storage.delete_many(batch))
@@ -0,0 +1,112 @@
+# django_1098t/services/uploads.py
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections
+from typing import Optional
+import threading
+
+
+# Bytes of PDF queued or uploading at once, unless configured
+DEFAULT_MAX_INFLIGHT_BYTES = 64 * 1024 * 1024
+
+
+def get_upload_workers(workers: Optional[int] = None) -> int:
+    """
+    Resolve the upload thread count, falling back to FORM_1098T_UPLOAD_WORKERS.
+    The default of 1 uploads inline; threaded uploads are opt-in.
+    """
+    if workers is None:
+        workers = getattr(settings, 'FORM_1098T_UPLOAD_WORKERS', 1)
+    return max(int(workers or 1), 1)
+
+
+class UploadPool:
+    """
+    Uploads forms through Form1098TStorage.save_form on a pool of threads.
+
+    submit() blocks while the PDFs already queued or uploading add up to
+    max_inflight_bytes, so a fast producer cannot pile up generated forms
+    in memory. A single form larger than the cap is still let through when
+    nothing else is in flight. Each upload is recorded as the upload stage
+    of timings, when given.
+
+    save_form may query the database (content-addressed storage does), so
+    every upload closes its thread's connections when it is done; nothing
+    else would close them.
+    """
+
+    def __init__(self, storage, workers: int, max_inflight_bytes: Optional[int] = None, timings=None):
+        self.storage = storage
+        self.timings = timings
+        if max_inflight_bytes is None:
+            max_inflight_bytes = getattr(
+                settings, 'FORM_1098T_UPLOAD_MAX_INFLIGHT_BYTES', DEFAULT_MAX_INFLIGHT_BYTES
+            )
+        self.max_inflight_bytes = max_inflight_bytes
+        self._inflight_bytes = 0
+        self._pending = set()
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='form1098t-upload')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # On errors, uploads that have not started are dropped
+        self.shutdown(cancel=exc_type is not None)
+
+    def submit(self, pdf_bytes, student_id: int, tax_year: int) -> Future:
+        """
+        Queue one upload.
+
+        Returns:
+            Future resolving to save_form's (file_path, file_size)
+        """
+        size = self._size(pdf_bytes)
+        with self._condition:
+            self._condition.wait_for(
+                lambda: not self._inflight_bytes or self._inflight_bytes + size <= self.max_inflight_bytes
+            )
+            self._inflight_bytes += size
+
+        try:
+            future = self._executor.submit(self._save, pdf_bytes, student_id, tax_year)
+        except BaseException:
+            self._release(size)
+            raise
+        with self._condition:
+            self._pending.add(future)
+        future.add_done_callback(lambda done: self._release(size, done))
+        return future
+
+    def shutdown(self, cancel: bool = False):
+        """Wait for running uploads to finish, optionally cancelling queued ones."""
+        if cancel:
+            # Executor.shutdown(cancel_futures=True) needs Python 3.9
+            with self._condition:
+                pending = list(self._pending)
+            for future in pending:
+                future.cancel()
+        self._executor.shutdown(wait=True)
+
+    def _save(self, pdf_bytes, student_id: int, tax_year: int) -> tuple:
+        try:
+            if self.timings is None:
+                return self.storage.save_form(pdf_bytes, student_id, tax_year)
+            with self.timings.time('upload'):
+                return self.storage.save_form(pdf_bytes, student_id, tax_year)
+        finally:
+            connections.close_all()
+
+    def _release(self, size: int, future: Optional[Future] = None):
+        with self._condition:
+            self._pending.discard(future)
+            self._inflight_bytes -= size
+            self._condition.notify_all()
+
+    @staticmethod
+    def _size(pdf_bytes) -> int:
+        if hasattr(pdf_bytes, 'getbuffer'):
+            return pdf_bytes.getbuffer().nbytes
+        return len(pdf_bytes)
@@ -1,6 +1,14 @@
+import copy
 import json
+import threading
+import time
+import uuid
 from django import forms
 from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
 from django.http import JsonResponse
 from django.urls import reverse_lazy
 from django.core.exceptions import ValidationError
@@ -93,6 +101,22 @@ class SettingForm(forms.Form):
 class f1098(SettingForm):
     key = str(__name__)
 
+    # Shared version token; saving the setting replaces it so every process
+    # reloads on its next from_db(). Only a cache backend shared by all
+    # workers (e.g. Redis or memcached) reaches other processes; with a
+    # process-local backend other processes see a change once their copy
+    # reaches the TTL.
+    VERSION_CACHE_KEY = 'django_1098t:f1098:version'
+
+    # Seconds a value read by this process is reused, as a backstop for a
+    # lost version update (e.g. a cache eviction or restart) and as the
+    # only expiry without a shared cache
+    DEFAULT_CACHE_TTL = 60
+
+    # (version, value, read at) last read by this process
+    _cached = None
+    _cached_lock = threading.Lock()
+
     def __init__(self, request, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -106,11 +130,44 @@ class f1098(SettingForm):
 
     @classmethod
     def from_db(cls):
+        shared = cls._cache_is_shared()
+        version = cache.get(cls.VERSION_CACHE_KEY) if shared else None
+        cached = cls._cached
+        ttl = getattr(settings, 'FORM_1098T_SETTINGS_CACHE_TTL', cls.DEFAULT_CACHE_TTL)
+        if (
+            cached is not None and cached[0] == version
+            and time.monotonic() - cached[2] < ttl
+        ):
+            return copy.deepcopy(cached[1])
+
         try:
             setting = Setting.objects.get(key=cls.key)
-            return setting.value
+            value = setting.value
         except Setting.DoesNotExist:
-            return {}
+            value = {}
+
+        with cls._cached_lock:
+            cls._cached = (version, copy.deepcopy(value), time.monotonic())
+        return value
+
+    @staticmethod
+    def _cache_is_shared() -> bool:
+        """Whether the default cache backend is visible to every worker process."""
+        return not isinstance(caches[DEFAULT_CACHE_ALIAS], (DummyCache, LocMemCache))
+
+    @classmethod
+    def invalidate_cache(cls):
+        """
+        Make every process reload the setting on its next from_db().
+
+        The shared version changes once the surrounding transaction commits,
+        so other processes cannot cache the old value under the new version.
+        """
+        with cls._cached_lock:
+            cls._cached = None
+        transaction.on_commit(
+            lambda: cache.set(cls.VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        )
 
     def install(self):
         defaults = {
@@ -127,6 +184,7 @@ class f1098(SettingForm):
 
         setting.value = defaults
         setting.save()
+        self.invalidate_cache()
 
     def run_record(self):
         try:
@@ -137,6 +195,7 @@ class f1098(SettingForm):
 
         setting.value = self._to_python()
         setting.save()
+        self.invalidate_cache()
 
         return JsonResponse({
             'message': 'Successfully saved settings',
@@ -0,0 +1,145 @@
+# django_1098t/signals.py
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from .services.dirty import (
+    clear_published_year_cache,
+    is_published_year,
+    mark_dirty,
+    start_published_year_cache,
+)
+
+
+TRANSACTION_MODEL = 'student_transactions.StudentTransaction'
+
+# User fields copied onto the form (name, TIN and address)
+USER_FORM_FIELDS = ('first_name', 'last_name', 'ssn', 'psid', 'address1', 'city', 'state', 'postal_code')
+
+
+def _transaction_key(instance):
+    created_on = getattr(instance, 'created_on', None)
+    return instance.student_id, created_on.year if created_on else None
+
+
+def _mark_transaction_years(keys, reason):
+    """Mark students whose transactions changed in years that have published forms."""
+    keys = {key for key in keys if key[1] is not None}
+    published = {key for key in keys if is_published_year(key[1])}
+    mark_dirty(published, reason)
+
+
+@receiver(post_init, sender=TRANSACTION_MODEL)
+def remember_loaded_transaction(sender, instance, **kwargs):
+    """Keep the student and year a transaction was loaded with, without a query."""
+    # Read __dict__ so deferred fields aren't fetched
+    values = instance.__dict__
+    created_on = values.get('created_on')
+    instance._f1098t_previous_key = None
+    if created_on and values.get('student_id') is not None:
+        instance._f1098t_previous_key = (values['student_id'], created_on.year)
+
+
+@receiver(pre_save, sender=TRANSACTION_MODEL)
+def remember_previous_transaction(sender, instance, **kwargs):
+    """
+    Read the student and year a transaction had before it was edited when
+    they weren't loaded (deferred fields), and only if its year is published.
+    """
+    if instance._state.adding or getattr(instance, '_f1098t_previous_key', None):
+        return
+    key = _transaction_key(instance)
+    if key[1] is None or not is_published_year(key[1]):
+        return
+    previous = sender.objects.filter(pk=instance.pk).values('student_id', 'created_on').first()
+    if previous and previous['created_on']:
+        instance._f1098t_previous_key = (previous['student_id'], previous['created_on'].year)
+
+
+@receiver(post_save, sender=TRANSACTION_MODEL)
+def transaction_saved(sender, instance, created, **kwargs):
+    keys = [_transaction_key(instance)]
+    previous_key = getattr(instance, '_f1098t_previous_key', None)
+    if previous_key:
+        keys.append(previous_key)
+    _mark_transaction_years(keys, 'transaction_created' if created else 'transaction_changed')
+    instance._f1098t_previous_key = keys[0] if keys[0][1] is not None else None
+
+
+@receiver(post_delete, sender=TRANSACTION_MODEL)
+def transaction_deleted(sender, instance, **kwargs):
+    _mark_transaction_years([_transaction_key(instance)], 'transaction_deleted')
+
+
+@receiver(request_started)
+def request_started_cache(sender, **kwargs):
+    """Remember which years are published for the rest of the request."""
+    start_published_year_cache()
+
+
+@receiver(request_finished)
+def request_finished_cache(sender, **kwargs):
+    clear_published_year_cache()
+
+
+def _user_form_values(instance):
+    # Read __dict__ so deferred fields aren't fetched
+    values = instance.__dict__
+    return {field: values[field] for field in USER_FORM_FIELDS if field in values}
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_loaded_user(sender, instance, **kwargs):
+    """Keep the form fields a user was loaded with, without a query."""
+    instance._f1098t_form_values = _user_form_values(instance)
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def remember_user_form_change(sender, instance, update_fields=None, **kwargs):
+    """
+    Note whether a save changes any user field shown on the form.
+    
+    Fields are compared with the values the user was loaded with. Only
+    fields that were deferred when it was loaded and have been set since
+    are read from the database, so ordinary saves add no query.
+    """
+    instance._f1098t_form_fields_changed = False
+    if not instance.pk or instance._state.adding:
+        return
+    
+    # Saves limited to other fields (e.g. last_login) cannot change the form
+    fields = [field.attname for field in sender._meta.concrete_fields if field.attname in USER_FORM_FIELDS]
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    # Deferred fields that were never set are not saved
+    current = instance.__dict__
+    fields = [field for field in fields if field in current]
+    if not fields:
+        return
+    
+    loaded = getattr(instance, '_f1098t_form_values', {})
+    changed = any(current[field] != loaded[field] for field in fields if field in loaded)
+    unknown = [field for field in fields if field not in loaded]
+    if not changed and unknown:
+        previous = sender.objects.filter(pk=instance.pk).values(*unknown).first()
+        changed = previous is not None and any(previous[field] != current[field] for field in unknown)
+    instance._f1098t_form_fields_changed = changed
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, created, **kwargs):
+    """Mark every published year of the user's student record."""
+    changed = getattr(instance, '_f1098t_form_fields_changed', False)
+    instance._f1098t_form_values = _user_form_values(instance)
+    if created or not changed:
+        return
+    
+    from .models import Form1098T
+    mark_dirty(
+        Form1098T.objects.filter(
+            student__user_id=instance.pk,
+            is_published=True
+        ).values_list('student_id', 'tax_year'),
+        'student_changed'
+    )
@@ -5,8 +5,10 @@ from rest_framework.routers import DefaultRouter
 from .views.student_views import download_form, student_forms_list, submit_consent, revoke_consent
 from .views.admin_views import (
     publish_forms_view,
+    publish_progress_view,
     download_statistics_view,
     bulk_download_forms,
+    bulk_print_forms,
     form_1098t_list_view  # Add this
 )
 from .views.api_views import Form1098TViewSet
@@ -27,8 +29,10 @@ urlpatterns = [
     # Admin URLs
     path('1098t/list/', form_1098t_list_view, name='admin_list'),  # Add this
     path('admin/publish/', publish_forms_view, name='admin_publish'),
+    path('admin/publish/progress/<uuid:run_id>/', publish_progress_view, name='publish_progress'),
     path('admin/statistics/', download_statistics_view, name='admin_statistics'),
     path('admin/bulk-download/<int:tax_year>/', bulk_download_forms, name='bulk_download'),
+    path('admin/bulk-print/<int:tax_year>/', bulk_print_forms, name='bulk_print'),
     
     # API URLs
     path('', include(router.urls)),
@@ -1,11 +1,11 @@
 # django_1098t/views/admin_views.py
 
 from django.contrib.admin.views.decorators import staff_member_required
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse, JsonResponse
 from ..services.publisher import Form1098TPublisher
-from ..models import Form1098T
+from ..models import Form1098T, Form1098TPublishRun
 from cis.models.student import Student
 import csv
 
@@ -14,8 +14,10 @@ from django.urls import reverse
 
 from datetime import datetime
 import zipfile
-from io import BytesIO
 from ..services.storage import Form1098TStorage
+from ..services.mailing import build_paper_mailing
+from ..services.jobs import resumable_runs, start_publish_job
+import tempfile
 
 from ..forms import PublishIndividualForm1098TForm
 
@@ -26,21 +28,34 @@ def publish_forms_view(request):
         tax_year = int(request.POST.get('tax_year'))
         action = request.POST.get('action')
         
-        publisher = Form1098TPublisher(tax_year, request.user)
-        
-        if action == 'publish_all':
-            results = publisher.publish_all_students()
-            messages.success(
-                request,
-                f"Published {results['success_count']} forms. "
-                f"Skipped {results['skipped_count']}. "
-                f"Errors: {results['error_count']}"
-            )
-            if results['errors']:
-                for error in results['errors'][:5]:
-                    messages.error(request, f"{error['student_name']}: {error['error']}")
+        if action in ('publish_all', 'resume'):
+            resume_run = None
+            if action == 'resume':
+                resume_run = resumable_runs(tax_year).first()
+                if resume_run is None:
+                    messages.warning(request, f"No unfinished publish run for {tax_year}")
+                    return redirect('django_1098t:admin_publish')
+            
+            # Publishing runs in the background; the run ID is the job ID
+            try:
+                run = start_publish_job(tax_year, request.user, resume_run=resume_run)
+            except ValueError as e:
+                # Another request resumed the run first
+                messages.warning(request, str(e))
+                return redirect('django_1098t:admin_publish')
+            progress_url = reverse('django_1098t:publish_progress', args=[run.id])
+            
+            if 'application/json' in request.headers.get('Accept', ''):
+                return JsonResponse(
+                    {'job_id': str(run.id), 'progress_url': progress_url},
+                    status=202
+                )
+            
+            messages.info(request, f"Publishing {tax_year} forms in the background (job {run.id}).")
+            return redirect(f"{reverse('django_1098t:admin_publish')}?job={run.id}")
         
         elif action == 'publish_student':
+            publisher = Form1098TPublisher(tax_year, request.user)
             student_id = request.POST.get('student_id')
             student = Student.objects.get(id=student_id)
             result = publisher.publish_student_form(student, regenerate=True)
@@ -56,12 +71,24 @@ def publish_forms_view(request):
     current_year = datetime.now().year
     years = range(current_year - 5, current_year + 1)
     
+    job = None
+    if request.GET.get('job'):
+        job = Form1098TPublishRun.objects.filter(id=request.GET['job']).first()
+    
     return render(request, 'django_1098t/admin_publish.html', {
         'years': years,
-        'current_year': current_year
+        'current_year': current_year,
+        'job': job
     })
 
 
+@staff_member_required
+def publish_progress_view(request, run_id):
+    """JSON progress of a background publish job."""
+    run = get_object_or_404(Form1098TPublishRun, id=run_id)
+    return JsonResponse(run.progress())
+
+
 @staff_member_required
 def download_statistics_view(request):
     """View download statistics for all forms."""
@@ -116,23 +143,48 @@ def bulk_download_forms(request, tax_year):
     ).select_related('student__user')
     
     storage = Form1098TStorage()
-    zip_buffer = BytesIO()
+    # Kept in memory for small years, spilled to disk for large ones
+    zip_buffer = tempfile.SpooledTemporaryFile(max_size=20 * 1024 * 1024)
     
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
         for form in forms:
+            filename = f"{form.student.id}_{form.student_name.replace(' ', '_')}_1098T_{tax_year}.pdf"
             try:
-                file_content = storage.get_file_content(form.file_path)
-                filename = f"{form.student.id}_{form.student_name.replace(' ', '_')}_1098T_{tax_year}.pdf"
-                zf.writestr(filename, file_content)
+                # Open first so a missing file leaves no empty entry
+                file_content = storage.iter_file_content(form.file_path)
+                with zf.open(filename, 'w') as entry:
+                    for chunk in file_content:
+                        entry.write(chunk)
             except Exception as e:
                 print(f"Error adding {form.id}: {e}")
     
-    response = HttpResponse(zip_buffer.getvalue(), content_type='application/zip')
-    response['Content-Disposition'] = f'attachment; filename="1098T_Forms_{tax_year}.zip"'
-    
-    return response
+    zip_buffer.seek(0)
+    return FileResponse(
+        zip_buffer,
+        as_attachment=True,
+        filename=f"1098T_Forms_{tax_year}.zip",
+        content_type='application/zip'
+    )
 
 
+@staff_member_required
+def bulk_print_forms(request, tax_year):
+    """
+    Download one print-ready PDF of all forms that must be mailed on paper
+    (students without electronic consent), sorted by postal code.
+    """
+    # Kept in memory for small mailings, spilled to disk for large ones
+    output = tempfile.SpooledTemporaryFile(max_size=20 * 1024 * 1024)
+    build_paper_mailing(tax_year, output)
+    output.seek(0)
+    
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f"1098T_Mailing_{tax_year}.pdf",
+        content_type='application/pdf'
+    )
+
 
 @staff_member_required
 def form_1098t_list_view(request):
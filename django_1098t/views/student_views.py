@@ -1,18 +1,24 @@
 # django_1098t/views/student_views.py
 
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, Http404
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404
 from django.shortcuts import get_object_or_404, render, redirect
 from django.utils import timezone
 from django.views.decorators.http import require_POST
+from ..constants import has_electronic_consent
 from ..models import Form1098T, Form1098TDownload
 from ..services.storage import Form1098TStorage
+from ..services.delivery import build_download_response
 from cis.utils import user_has_cis_role, user_has_student_role
 
 @login_required
 def download_form(request, form_id):
     """
-    Download a 1098-T form (proxied through Django for access control).
+    Download a 1098-T form.
+    
+    Access is always checked here; the bytes are proxied through Django or
+    offloaded per FORM_1098T_DELIVERY_MODE.
     """
     # Get the form
     form = get_object_or_404(Form1098T, id=form_id, is_published=True)
@@ -24,16 +30,19 @@ def download_form(request, form_id):
 
         # Check if student has consented to electronic delivery
         student = request.user.student
-        if not student.meta or not student.meta.get('form_1098_consent_granted_on'):
+        if not has_electronic_consent(student):
             return redirect('django_1098t:student_forms_list')
 
     elif request and not user_has_cis_role(request.user):
         raise Http404("Form not found")
     
-    # Retrieve file from S3
+    # Stream file from S3, or hand it off
     storage = Form1098TStorage()
+    filename = f'1098-T_{form.tax_year}_{form.student_name.replace(" ", "_")}.pdf'
     try:
-        file_content = storage.get_file_content(form.file_path)
+        response = build_download_response(storage, form, filename)
+    except ImproperlyConfigured:
+        raise
     except Exception as e:
         raise Http404("Form file not found")
     
@@ -46,11 +55,6 @@ def download_form(request, form_id):
         user_agent=request.META.get('HTTP_USER_AGENT', '')[:255]
     )
     
-    # Return PDF
-    response = HttpResponse(file_content, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="1098-T_{form.tax_year}_{form.student_name.replace(" ", "_")}.pdf"'
-    response['Content-Length'] = len(file_content)
-    
     return response
 
 
@@ -81,7 +85,7 @@ def student_forms_list(request):
     menu = draw_menu(STUDENT_MENU, 'f1098t', '', 'student')
 
     # Check if student has consented to electronic delivery
-    needs_consent = not student.meta or not student.meta.get('form_1098_consent_granted_on')
+    needs_consent = not has_electronic_consent(student)
 
     if needs_consent:
         # Get consent language from settings
@@ -0,0 +1,30 @@
+# django_1098t/workers.py
+
+import multiprocessing
+
+
+def spawn_context():
+    """
+    Start method for the app's worker processes.
+
+    Pools are created from threaded web views and job threads, and forking
+    while another thread holds a lock (template caches, DB or SSL state)
+    can deadlock the child, so workers are always spawned.
+    """
+    return multiprocessing.get_context('spawn')
+
+
+def init_worker(initializer_path: str = None, *args):
+    """
+    Pool initializer for spawned workers: set Django up, then run the
+    initializer at initializer_path with args.
+
+    Lives outside django_1098t.services because importing that package
+    loads the models, which needs Django set up first.
+    """
+    import django
+    django.setup()
+
+    if initializer_path:
+        from django.utils.module_loading import import_string
+        import_string(initializer_path)(*args)
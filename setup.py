@@ -21,7 +21,7 @@ setup(
     include_package_data=True,
     install_requires=[
         'Django>=3.2',
-        'pypdf>=4.0.0',
+        'pypdf>=4.2.0,<7',
     ],
     classifiers=[
         'Development Status :: 4 - Beta',
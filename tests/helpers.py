@@ -0,0 +1,110 @@
+# tests/helpers.py
+
+from decimal import Decimal
+from itertools import count
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from cis.models.student import Student
+from django_1098t.services.backends import MemoryStorage
+from django_1098t.services.publisher import Form1098TPublisher
+
+
+TAX_YEAR = 2025
+
+MEMORY_STORAGE = f'{MemoryStorage.__module__}.MemoryStorage'
+
+FILER_INFO = {
+    'name': 'Test University',
+    'ein': '12-3456789',
+    'address': '1 University Ave, Springfield, IL 62701',
+    'phone': '555-123-4567',
+}
+
+_student_numbers = count(1)
+
+
+def make_student(**user_fields) -> Student:
+    """A student whose user has every field the form prints."""
+    number = next(_student_numbers)
+    fields = {
+        'username': f'student{number}',
+        'first_name': 'Jane',
+        'last_name': f'Doe{number}',
+        'ssn': f'123-45-{number:04d}',
+        'psid': f'P{number:06d}',
+        'address1': f'{number} Elm St',
+        'city': 'Springfield',
+        'state': 'IL',
+        'postal_code': '62704',
+    }
+    fields.update(user_fields)
+    return Student.objects.create(user=get_user_model().objects.create(**fields))
+
+
+def make_summary(payments='1200.00', scholarships='300.00', refunds='0.00') -> dict:
+    """A summary as StudentTransaction.objects.get_bulk_1098t_summary returns it."""
+    return {
+        'charges': Decimal('0.00'),
+        'refunds': Decimal(refunds),
+        'payments': Decimal(payments),
+        'scholarships': Decimal(scholarships),
+    }
+
+
+def clear_memory_storage():
+    MemoryStorage.files.clear()
+    MemoryStorage.modified.clear()
+
+
+class PublishTestCase(TestCase):
+    """
+    Publishes into MemoryStorage with fixed filer settings.
+
+    Tests set self.summaries[student.id] instead of creating transactions;
+    self.transaction_students stands in for the students with transactions
+    in the year.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.summaries = {}
+        self.transaction_students = []
+        clear_memory_storage()
+        self.addCleanup(clear_memory_storage)
+
+        storage_settings = override_settings(DJANGO_1098T_STORAGE_CLASS=MEMORY_STORAGE)
+        storage_settings.enable()
+        self.addCleanup(storage_settings.disable)
+
+        test_case = self
+
+        def get_summaries(publisher, student_ids):
+            return {
+                student_id: test_case.summaries[student_id]
+                for student_id in student_ids if student_id in test_case.summaries
+            }
+
+        def transaction_student_ids(publisher):
+            return [student.id for student in test_case.transaction_students]
+
+        for patcher in (
+            mock.patch('django_1098t.services.generator.get_filer_info', return_value=FILER_INFO),
+            mock.patch.object(Form1098TPublisher, '_get_summaries', get_summaries),
+            mock.patch.object(Form1098TPublisher, '_transaction_student_ids', transaction_student_ids),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def make_students(self, number, **summary):
+        """Students with qualifying amounts and transactions in the year."""
+        students = [make_student() for _ in range(number)]
+        for student in students:
+            self.summaries[student.id] = make_summary(**summary)
+        self.transaction_students.extend(students)
+        return students
+
+    def publisher(self, **kwargs) -> Form1098TPublisher:
+        return Form1098TPublisher(TAX_YEAR, None, **kwargs)
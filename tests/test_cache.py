@@ -0,0 +1,111 @@
+# tests/test_cache.py
+
+import os
+import time
+
+import pytest
+
+# django_1098t.services imports the host project's models
+pytest.importorskip('cis')
+pytest.importorskip('student_transactions')
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from django_1098t.services import cache
+from django_1098t.services.backends import MemoryStorage
+from django_1098t.services.cache import DiskFormCache, MemoryFormCache
+from django_1098t.services.storage import Form1098TStorage
+
+from .helpers import clear_memory_storage
+
+
+def entry(index):
+    """A 10-byte form, so a cache of 80 bytes holds eight."""
+    return f'form {index:05d}'.encode()
+
+
+def test_memory_cache_evicts_least_recently_used():
+    form_cache = MemoryFormCache(80)
+    for index in range(8):
+        form_cache.set(f'path/{index}', entry(index))
+
+    assert form_cache.get('path/0') == entry(0)
+    form_cache.set('path/8', entry(8))
+
+    assert form_cache.get('path/1') is None
+    assert form_cache.get('path/0') == entry(0)
+    assert form_cache.get('path/8') == entry(8)
+
+
+def test_memory_cache_skips_large_forms():
+    form_cache = MemoryFormCache(80)
+
+    form_cache.set('large', b'x' * (form_cache.max_entry_bytes + 1))
+
+    assert form_cache.get('large') is None
+
+
+def test_memory_cache_delete_frees_room():
+    form_cache = MemoryFormCache(80)
+    for index in range(8):
+        form_cache.set(f'path/{index}', entry(index))
+
+    form_cache.delete('path/7')
+    form_cache.set('path/8', entry(8))
+
+    assert form_cache.get('path/7') is None
+    assert all(form_cache.get(f'path/{index}') == entry(index) for index in (0, 8))
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    form_cache = DiskFormCache(str(tmp_path), 80)
+    now = time.time()
+    for index in range(8):
+        form_cache.set(f'path/{index}', entry(index))
+        os.utime(form_cache._entry_path(f'path/{index}'), (now - 100 + index, now - 100 + index))
+
+    # A hit makes path/0 the most recently used
+    assert form_cache.get('path/0') == entry(0)
+    form_cache.set('path/8', entry(8))
+
+    assert form_cache.get('path/1') is None
+    assert form_cache.get('path/0') == entry(0)
+    assert form_cache.get('path/8') == entry(8)
+
+
+def test_disk_cache_is_shared_by_instances(tmp_path):
+    DiskFormCache(str(tmp_path), 80).set('path/0', entry(0))
+
+    form_cache = DiskFormCache(str(tmp_path), 80)
+
+    assert form_cache.get('path/0') == entry(0)
+    form_cache.delete('path/0')
+    assert form_cache.get('path/0') is None
+
+
+@override_settings(FORM_1098T_READ_CACHE='redis')
+def test_unknown_cache_is_rejected(monkeypatch):
+    monkeypatch.setattr(cache, '_form_cache', None)
+
+    with pytest.raises(ImproperlyConfigured):
+        cache.get_form_cache()
+
+
+def test_storage_reads_through_the_cache():
+    clear_memory_storage()
+    storage = Form1098TStorage(MemoryStorage(), content_addressed=False)
+    storage.cache = MemoryFormCache(1024)
+    file_path, _ = storage.save_form(entry(0), 1, 2025)
+
+    assert storage.get_file_content(file_path) == entry(0)
+    # Served from the cache once read
+    MemoryStorage.files.pop(file_path)
+    assert storage.get_file_content(file_path) == entry(0)
+    assert b''.join(storage.iter_file_content(file_path, chunk_size=4)) == entry(0)
+
+    storage.delete_form(file_path)
+    assert storage.cache.get(file_path) is None
+    with pytest.raises(FileNotFoundError):
+        storage.get_file_content(file_path)
+    clear_memory_storage()
@@ -0,0 +1,95 @@
+# tests/test_delivery.py
+
+from unittest import mock
+
+import pytest
+
+# django_1098t.services imports the host project's models
+pytest.importorskip('cis')
+pytest.importorskip('student_transactions')
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import StreamingHttpResponse
+from django.test import override_settings
+
+from django_1098t.models import Form1098T
+from django_1098t.services.backends import LocalFileStorage, MemoryStorage
+from django_1098t.services.delivery import build_download_response
+from django_1098t.services.storage import Form1098TStorage
+
+from .helpers import clear_memory_storage
+
+
+PDF = b'%PDF-1.7 delivered form'
+FILE_PATH = 'django_1098t/2025/student 1.pdf'
+FILENAME = '1098T_2025.pdf'
+
+
+@pytest.fixture
+def storage():
+    clear_memory_storage()
+    MemoryStorage.files[FILE_PATH] = PDF
+    yield Form1098TStorage(MemoryStorage(), content_addressed=False)
+    clear_memory_storage()
+
+
+@pytest.fixture
+def form():
+    return Form1098T(file_path=FILE_PATH, file_size=len(PDF))
+
+
+def assert_proxied(response):
+    assert isinstance(response, StreamingHttpResponse)
+    assert b''.join(response.streaming_content) == PDF
+    assert response['Content-Length'] == str(len(PDF))
+    assert response['Content-Disposition'] == f'attachment; filename="{FILENAME}"'
+
+
+def test_proxy_streams_the_form(storage, form):
+    assert_proxied(build_download_response(storage, form, FILENAME))
+
+
+@override_settings(FORM_1098T_DELIVERY_MODE='redirect')
+def test_redirect_to_signed_url(storage, form):
+    with mock.patch.object(storage, 'signed_url', return_value='https://bucket.example/form?sig=1') as signed_url:
+        response = build_download_response(storage, form, FILENAME)
+
+    signed_url.assert_called_once_with(FILE_PATH, filename=FILENAME)
+    assert response.status_code == 302
+    assert response['Location'] == 'https://bucket.example/form?sig=1'
+    assert response['Cache-Control'] == 'private, no-store'
+
+
+@override_settings(FORM_1098T_DELIVERY_MODE='redirect')
+def test_redirect_falls_back_to_proxy_without_signed_urls(storage, form):
+    assert_proxied(build_download_response(storage, form, FILENAME))
+
+
+@override_settings(FORM_1098T_DELIVERY_MODE='x-accel-redirect', FORM_1098T_ACCEL_REDIRECT_PREFIX='/internal/')
+def test_x_accel_redirect(storage, form):
+    response = build_download_response(storage, form, FILENAME)
+
+    assert response['X-Accel-Redirect'] == '/internal/django_1098t/2025/student%201.pdf'
+    assert response['Content-Disposition'] == f'attachment; filename="{FILENAME}"'
+    assert response.content == b''
+
+
+@override_settings(FORM_1098T_DELIVERY_MODE='x-sendfile')
+def test_x_sendfile_serves_the_local_path(tmp_path, form):
+    local_storage = Form1098TStorage(LocalFileStorage(location=str(tmp_path)), content_addressed=False)
+
+    response = build_download_response(local_storage, form, FILENAME)
+
+    assert response['X-Sendfile'] == str(tmp_path / FILE_PATH)
+    assert response.content == b''
+
+
+@override_settings(FORM_1098T_DELIVERY_MODE='x-sendfile')
+def test_x_sendfile_falls_back_to_proxy_without_a_local_path(storage, form):
+    assert_proxied(build_download_response(storage, form, FILENAME))
+
+
+@override_settings(FORM_1098T_DELIVERY_MODE='ftp')
+def test_unknown_mode_is_rejected(storage, form):
+    with pytest.raises(ImproperlyConfigured):
+        build_download_response(storage, form, FILENAME)
@@ -0,0 +1,96 @@
+# tests/test_dirty.py
+
+import pytest
+
+# django_1098t.services imports the host project's models
+pytest.importorskip('cis')
+pytest.importorskip('student_transactions')
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from django_1098t.models import Form1098T, Form1098TDirtyStudent
+from django_1098t.services.dirty import drain_dirty_students, mark_dirty
+
+from .helpers import TAX_YEAR, PublishTestCase, make_summary
+from .test_publisher import failing_build_form
+
+
+class UserChangeTests(PublishTestCase):
+    """Saving a user marks their published forms dirty only when a printed field changes."""
+
+    def setUp(self):
+        super().setUp()
+        self.student, = self.make_students(1)
+        self.publisher().publish_all_students([self.student.id])
+        self.user = get_user_model().objects.get(pk=self.student.user_id)
+
+    def is_dirty(self):
+        return Form1098TDirtyStudent.objects.filter(student=self.student, tax_year=TAX_YEAR).exists()
+
+    def test_name_change_marks_dirty(self):
+        self.user.last_name = 'Smith'
+        self.user.save()
+
+        mark = Form1098TDirtyStudent.objects.get(student=self.student, tax_year=TAX_YEAR)
+        self.assertEqual(mark.reason, 'student_changed')
+
+    def test_save_without_changes_does_not_mark(self):
+        self.user.save()
+
+        self.assertFalse(self.is_dirty())
+
+    def test_unrelated_update_fields_add_no_query(self):
+        self.user.last_login = timezone.now()
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+
+        self.assertFalse(self.is_dirty())
+
+    def test_deferred_field_change_marks_dirty(self):
+        user = get_user_model().objects.only('id').get(pk=self.user.pk)
+        user.ssn = '987-65-4321'
+        user.save()
+
+        self.assertTrue(self.is_dirty())
+
+
+class DrainTests(PublishTestCase):
+    """drain_dirty_students republishes marked students and clears their marks."""
+
+    def setUp(self):
+        super().setUp()
+        self.students = self.make_students(2)
+        self.publisher().publish_all_students([student.id for student in self.students])
+        mark_dirty([(student.id, TAX_YEAR) for student in self.students], 'transaction_changed')
+
+    def test_drain_republishes_and_unpublishes(self):
+        changed, zeroed = self.students
+        self.summaries[changed.id] = make_summary(payments='2400.00')
+        self.summaries[zeroed.id] = make_summary(payments='0.00', scholarships='0.00')
+
+        results = drain_dirty_students(None)
+
+        self.assertEqual(results[TAX_YEAR]['success_count'], 1)
+        self.assertEqual(results[TAX_YEAR]['skipped_count'], 1)
+        self.assertEqual(results[TAX_YEAR]['unpublished_count'], 1)
+        form = Form1098T.objects.get(student=changed, is_published=True)
+        self.assertEqual(str(form.payments_received), '2400.00')
+        self.assertFalse(Form1098T.objects.filter(student=zeroed, is_published=True).exists())
+        self.assertFalse(Form1098TDirtyStudent.objects.exists())
+
+    def test_failed_students_stay_marked(self):
+        failed, republished = self.students
+        for student in self.students:
+            self.summaries[student.id] = make_summary(payments='2400.00')
+
+        with failing_build_form(failed):
+            results = drain_dirty_students(None, tax_year=TAX_YEAR)
+
+        self.assertEqual(results[TAX_YEAR]['error_count'], 1)
+        form = Form1098T.objects.get(student=republished, is_published=True)
+        self.assertEqual(str(form.payments_received), '2400.00')
+        self.assertEqual(
+            list(Form1098TDirtyStudent.objects.values_list('student_id', flat=True)),
+            [failed.id]
+        )
@@ -0,0 +1,60 @@
+# tests/test_jobs.py
+
+from datetime import timedelta
+
+import pytest
+
+# django_1098t.services imports the host project's models
+pytest.importorskip('cis')
+pytest.importorskip('student_transactions')
+
+from django.test import TestCase
+from django.utils import timezone
+
+from django_1098t.models import Form1098TPublishRun
+from django_1098t.services.jobs import claim_run, start_publish_job
+
+from .helpers import TAX_YEAR
+
+
+class ClaimRunTests(TestCase):
+    """Only one caller can resume a run."""
+
+    def make_run(self, status, age=timedelta(0)):
+        run = Form1098TPublishRun.objects.create(tax_year=TAX_YEAR, status=status)
+        # updated_at is auto_now, so age it with a queryset update
+        Form1098TPublishRun.objects.filter(id=run.id).update(updated_at=timezone.now() - age)
+        run.refresh_from_db()
+        return run
+
+    def test_failed_run_is_claimed_once(self):
+        run = self.make_run(Form1098TPublishRun.STATUS_FAILED)
+        run.finished_at = timezone.now()
+        run.save(update_fields=['finished_at'])
+        other = Form1098TPublishRun.objects.get(id=run.id)
+
+        self.assertTrue(claim_run(run))
+        self.assertEqual(run.status, Form1098TPublishRun.STATUS_RUNNING)
+        self.assertIsNone(run.finished_at)
+        self.assertFalse(claim_run(other))
+
+    def test_running_run_is_claimed_once_stale(self):
+        fresh = self.make_run(Form1098TPublishRun.STATUS_RUNNING, age=timedelta(minutes=5))
+        stale = self.make_run(Form1098TPublishRun.STATUS_RUNNING, age=timedelta(hours=2))
+
+        self.assertFalse(claim_run(fresh))
+        self.assertTrue(claim_run(stale))
+
+    def test_completed_run_is_not_claimed(self):
+        run = self.make_run(Form1098TPublishRun.STATUS_COMPLETED, age=timedelta(days=1))
+
+        self.assertFalse(claim_run(run))
+        with self.assertRaises(ValueError):
+            start_publish_job(TAX_YEAR, None, resume_run=run)
+
+    def test_job_is_handed_over_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            run = start_publish_job(TAX_YEAR, None)
+
+        self.assertEqual(run.status, Form1098TPublishRun.STATUS_RUNNING)
+        self.assertEqual(len(callbacks), 1)
@@ -0,0 +1,80 @@
+# tests/test_parity.py
+
+import pytest
+from pypdf import PdfReader
+
+# django_1098t.services imports the host project's models
+pytest.importorskip('cis')
+pytest.importorskip('student_transactions')
+
+from django_1098t.constants import get_template_path
+from django_1098t.services.compiled import compare_with_pypdf
+from django_1098t.services.generator import Form1098TGenerator
+
+
+FILER_INFO = {
+    'name': 'Test University',
+    'ein': '12-3456789',
+    'address': '1 University Ave, Springfield, IL 62701',
+    'phone': '555-123-4567',
+}
+
+STUDENT_DATA = {
+    'name': 'Jane Doe',
+    'tin': '123-45-6789',
+    'service_provider_account_number': 'A0001',
+    'address': '5 Elm St',
+    'address2': 'Springfield, IL 62704',
+}
+
+RECORDS = {
+    'required_only': (
+        STUDENT_DATA,
+        {'payments': 1200.5, 'scholarships': 300},
+    ),
+    'all_fields': (
+        STUDENT_DATA,
+        {'payments': 15000, 'scholarships': 4250.75},
+        {'adjustments': 120, 'scholarship_adjustments': 35.5, 'insurance_refund': 10},
+        {'jan_march': True, 'halftime': True, 'graduate': True, 'corrected': True},
+    ),
+    'mixed_checkboxes': (
+        STUDENT_DATA,
+        {'payments': 800, 'scholarships': 0},
+        None,
+        {'jan_march': False, 'halftime': True, 'graduate': False, 'corrected': False},
+    ),
+    'empty_fields': (
+        {
+            'name': "O'Brien (Jr.)",
+            'tin': '',
+            'service_provider_account_number': '',
+            'address': '',
+            'address2': '',
+        },
+        {'payments': 0, 'scholarships': 0},
+        {'adjustments': 0, 'scholarship_adjustments': 0, 'insurance_refund': 0},
+        {},
+    ),
+}
+
+
+@pytest.fixture(scope='module')
+def generator():
+    return Form1098TGenerator(get_template_path(2025), filer_info=FILER_INFO, engine='compiled')
+
+
+@pytest.mark.parametrize('record', RECORDS.values(), ids=list(RECORDS))
+def test_compiled_engine_matches_pypdf(generator, record):
+    assert compare_with_pypdf(generator, record) == []
+
+
+@pytest.mark.parametrize('engine', Form1098TGenerator.ENGINES)
+def test_engines_fill_the_template(engine):
+    generator = Form1098TGenerator(get_template_path(2025), filer_info=FILER_INFO, engine=engine)
+    output = generator.generate_record(RECORDS['all_fields'])
+
+    fields = PdfReader(output).get_fields()
+    values = {str(field.get('/V')) for field in fields.values()}
+    assert 'Jane Doe' in values
+    assert '15000.00' in values
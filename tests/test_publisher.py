@@ -0,0 +1,177 @@
+# tests/test_publisher.py
+
+from unittest import mock
+
+import pytest
+
+# django_1098t.services imports the host project's models
+pytest.importorskip('cis')
+pytest.importorskip('student_transactions')
+
+from django.test import override_settings
+
+from django_1098t.models import Form1098T, Form1098TPublishRun
+from django_1098t.services.backends import MemoryStorage
+from django_1098t.services.publisher import Form1098TPublisher
+
+from .helpers import TAX_YEAR, PublishTestCase, make_summary
+
+
+def published_student_ids():
+    return set(Form1098T.objects.filter(tax_year=TAX_YEAR, is_published=True).values_list('student_id', flat=True))
+
+
+def failing_build_form(*bad_students):
+    """Patch Form1098TPublisher._build_form to fail for the given students."""
+    bad_ids = {student.id for student in bad_students}
+    build_form = Form1098TPublisher._build_form
+
+    def patched(publisher, student, *args, **kwargs):
+        if student.id in bad_ids:
+            raise ValueError(f"bad row for {student.id}")
+        return build_form(publisher, student, *args, **kwargs)
+
+    return mock.patch.object(Form1098TPublisher, '_build_form', patched)
+
+
+class ChunkWriteTests(PublishTestCase):
+    """A bad row fails only its own student (_write_rows' savepoint fallback)."""
+
+    def test_bad_row_fails_only_its_student(self):
+        students = self.make_students(3)
+        bad = students[1]
+
+        with failing_build_form(bad), self.captureOnCommitCallbacks(execute=True):
+            results = self.publisher().publish_all_students([student.id for student in students])
+
+        self.assertEqual(results['success_count'], 2)
+        self.assertEqual(results['error_count'], 1)
+        self.assertEqual(results['errors'][0]['student_id'], bad.id)
+        self.assertEqual(published_student_ids(), {students[0].id, students[2].id})
+        # The failed student's upload is removed with its row
+        self.assertEqual(len(MemoryStorage.files), 2)
+
+        run = Form1098TPublishRun.objects.get(id=results['run_id'])
+        self.assertEqual(run.status, Form1098TPublishRun.STATUS_COMPLETED)
+        self.assertEqual(run.errors[0]['student_id'], str(bad.id))
+
+    @override_settings(FORM_1098T_RUN_MAX_ERRORS=1)
+    def test_run_keeps_only_the_first_errors(self):
+        students = self.make_students(3)
+
+        with failing_build_form(students[0], students[1]):
+            results = self.publisher().publish_all_students([student.id for student in students])
+
+        run = Form1098TPublishRun.objects.get(id=results['run_id'])
+        self.assertEqual(run.error_count, 2)
+        self.assertEqual(len(run.errors), 1)
+
+
+class ResumeTests(PublishTestCase):
+    """An interrupted run resumes after its last committed chunk."""
+
+    def interrupt_second_chunk(self):
+        write_rows = Form1098TPublisher._write_rows
+        calls = []
+
+        def patched(publisher, uploaded):
+            calls.append(uploaded)
+            if len(calls) == 2:
+                raise RuntimeError('database went away')
+            return write_rows(publisher, uploaded)
+
+        return mock.patch.object(Form1098TPublisher, '_write_rows', patched)
+
+    @override_settings(FORM_1098T_PUBLISH_CHUNK_SIZE=1)
+    def test_resume_continues_after_the_checkpoint(self):
+        first, second, third = self.make_students(3)
+
+        with self.interrupt_second_chunk(), self.assertRaises(RuntimeError):
+            self.publisher().publish_all_students()
+
+        run = Form1098TPublishRun.objects.get()
+        self.assertEqual(run.status, Form1098TPublishRun.STATUS_FAILED)
+        self.assertEqual(run.failure_reason, 'database went away')
+        self.assertEqual(run.last_student_id, str(first.id))
+        self.assertEqual(run.success_count, 1)
+        self.assertEqual(published_student_ids(), {first.id})
+        # The interrupted chunk's upload was removed
+        self.assertEqual(len(MemoryStorage.files), 1)
+
+        results = self.publisher().publish_all_students(resume_run=run)
+
+        self.assertEqual(results['success_count'], 3)
+        self.assertEqual(published_student_ids(), {first.id, second.id, third.id})
+        self.assertEqual(Form1098T.objects.filter(student=first).count(), 1)
+        run.refresh_from_db()
+        self.assertEqual(run.status, Form1098TPublishRun.STATUS_COMPLETED)
+        self.assertEqual(run.chunks_completed, 3)
+
+    @override_settings(FORM_1098T_PUBLISH_CHUNK_SIZE=1)
+    def test_resume_keeps_the_students_selected_at_start(self):
+        students = self.make_students(3)
+
+        with self.interrupt_second_chunk(), self.assertRaises(RuntimeError):
+            self.publisher().publish_all_students()
+
+        run = Form1098TPublishRun.objects.get()
+        self.assertEqual(sorted(run.student_ids), sorted(str(student.id) for student in students))
+
+        # A student who gets transactions after the run started is left for the next run
+        late, = self.make_students(1)
+        self.publisher().publish_all_students(resume_run=run)
+
+        self.assertEqual(published_student_ids(), {student.id for student in students})
+        self.assertNotIn(late.id, published_student_ids())
+
+
+class FingerprintTests(PublishTestCase):
+    """Students whose inputs haven't changed are not rebuilt."""
+
+    def test_unchanged_students_are_left_alone(self):
+        students = self.make_students(2)
+        student_ids = [student.id for student in students]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.publisher().publish_all_students(student_ids)
+        forms = dict(Form1098T.objects.filter(is_published=True).values_list('student_id', 'id'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            results = self.publisher().publish_all_students(student_ids)
+
+        self.assertEqual(results['success_count'], 0)
+        self.assertEqual(results['unchanged_count'], 2)
+        self.assertEqual(dict(Form1098T.objects.filter(is_published=True).values_list('student_id', 'id')), forms)
+        self.assertEqual(len(MemoryStorage.files), 2)
+
+    def test_changed_inputs_are_republished(self):
+        changed, unchanged = self.make_students(2)
+        student_ids = [changed.id, unchanged.id]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.publisher().publish_all_students(student_ids)
+        old_path = Form1098T.objects.get(student=changed, is_published=True).file_path
+
+        self.summaries[changed.id] = make_summary(payments='2400.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            results = self.publisher().publish_all_students(student_ids)
+
+        self.assertEqual(results['success_count'], 1)
+        self.assertEqual(results['unchanged_count'], 1)
+        form = Form1098T.objects.get(student=changed, is_published=True)
+        self.assertEqual(str(form.payments_received), '2400.00')
+        # The replaced file is deleted once the new row commits
+        self.assertNotIn(old_path, MemoryStorage.files)
+        self.assertEqual(len(MemoryStorage.files), 2)
+
+    def test_force_rebuilds_every_form(self):
+        students = self.make_students(2)
+        student_ids = [student.id for student in students]
+
+        self.publisher().publish_all_students(student_ids)
+        results = self.publisher().publish_all_students(student_ids, force=True)
+
+        self.assertEqual(results['success_count'], 2)
+        self.assertEqual(results['unchanged_count'], 0)
+        self.assertEqual(Form1098T.objects.filter(is_published=True).count(), 2)
+        self.assertEqual(Form1098T.objects.filter(is_published=False).count(), 2)
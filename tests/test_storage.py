@@ -0,0 +1,101 @@
+# tests/test_storage.py
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+
+# django_1098t.services imports the host project's models
+pytest.importorskip('cis')
+pytest.importorskip('student_transactions')
+
+from django.test import TestCase
+from django.utils import timezone
+
+from django_1098t.models import Form1098T
+from django_1098t.services.backends import MemoryStorage
+from django_1098t.services.storage import CONTENT_ADDRESSED_PREFIX, Form1098TStorage
+
+from .helpers import TAX_YEAR, clear_memory_storage, make_student
+
+
+PDF = b'%PDF-1.7 same form'
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Identical forms share one object, which only sweep_content deletes."""
+
+    def setUp(self):
+        super().setUp()
+        clear_memory_storage()
+        self.addCleanup(clear_memory_storage)
+        self.storage = Form1098TStorage(MemoryStorage(), content_addressed=True)
+        self.student = make_student()
+
+    def make_form(self, file_path, is_published=True):
+        return Form1098T.objects.create(
+            student=self.student,
+            tax_year=TAX_YEAR,
+            payments_received=Decimal('1200.00'),
+            scholarships_grants=Decimal('300.00'),
+            student_name='Jane Doe',
+            student_address='1 Elm St, Springfield, IL 62704',
+            file_path=file_path,
+            file_size=len(PDF),
+            is_published=is_published
+        )
+
+    @staticmethod
+    def age(file_path, seconds):
+        MemoryStorage.modified[file_path] = timezone.now() - timedelta(seconds=seconds)
+
+    def test_identical_forms_share_one_object(self):
+        first_path, size = self.storage.save_form(PDF, 1, TAX_YEAR)
+        second_path, _ = self.storage.save_form(PDF, 2, TAX_YEAR)
+
+        self.assertEqual(first_path, Form1098TStorage._content_path(PDF))
+        self.assertTrue(first_path.startswith(CONTENT_ADDRESSED_PREFIX))
+        self.assertEqual(second_path, first_path)
+        self.assertEqual(size, len(PDF))
+        self.assertEqual(list(MemoryStorage.files), [first_path])
+
+    def test_unreferenced_object_is_written_afresh(self):
+        file_path, _ = self.storage.save_form(PDF, 1, TAX_YEAR)
+        self.age(file_path, 3600)
+        aged = MemoryStorage.modified[file_path]
+
+        self.assertEqual(self.storage.save_form(PDF, 1, TAX_YEAR)[0], file_path)
+        self.assertGreater(MemoryStorage.modified[file_path], aged)
+        self.assertEqual(list(MemoryStorage.files), [file_path])
+
+    def test_referenced_object_is_reused(self):
+        file_path, _ = self.storage.save_form(PDF, 1, TAX_YEAR)
+        self.make_form(file_path)
+        self.age(file_path, 3600)
+        aged = MemoryStorage.modified[file_path]
+
+        self.assertEqual(self.storage.save_form(PDF, 2, TAX_YEAR)[0], file_path)
+        self.assertEqual(MemoryStorage.modified[file_path], aged)
+
+    def test_delete_keeps_shared_objects(self):
+        shared_path, _ = self.storage.save_form(PDF, 1, TAX_YEAR)
+        own_path, _ = Form1098TStorage(MemoryStorage(), content_addressed=False).save_form(PDF, 1, TAX_YEAR)
+
+        self.storage.delete_form(shared_path)
+        self.assertEqual(self.storage.delete_many([shared_path, own_path]), [])
+
+        self.assertEqual(list(MemoryStorage.files), [shared_path])
+
+    def test_sweep_deletes_only_unused_old_objects(self):
+        unused, _ = self.storage.save_form(b'%PDF-1.7 unused', 1, TAX_YEAR)
+        published, _ = self.storage.save_form(b'%PDF-1.7 published', 1, TAX_YEAR)
+        replaced, _ = self.storage.save_form(b'%PDF-1.7 replaced', 1, TAX_YEAR)
+        recent, _ = self.storage.save_form(b'%PDF-1.7 recent', 1, TAX_YEAR)
+        for file_path in (unused, published, replaced):
+            self.age(file_path, 7200)
+        self.make_form(published)
+        # Unpublished a moment ago, so its object is still within the grace period
+        self.make_form(replaced, is_published=False)
+
+        self.assertEqual(self.storage.sweep_content(grace_seconds=3600), [unused])
+        self.assertEqual(set(MemoryStorage.files), {published, replaced, recent})